@@ -3,7 +3,8 @@ Utility for brand-detection logic in GSC Exporter.
 """
 import os
 import re
-from urllib.parse import urlparse
+import pandas as pd
+from core.naming import get_hostname
 
 def get_brand_terms(site_url, brand_terms=None, brand_terms_file=None, no_brand_detection=False):
     """
@@ -43,9 +44,7 @@ def get_brand_terms(site_url, brand_terms=None, brand_terms_file=None, no_brand_
                     all_brand_terms.update(line.strip() for line in f if line.strip())
             else:
                 # Try domain root (e.g. hr-inform)
-                hostname = urlparse(site_url).hostname
-                if not hostname and site_url.startswith('sc-domain:'):
-                    hostname = site_url.replace('sc-domain:', '')
+                hostname = get_hostname(site_url)
                 
                 if hostname:
                     root = hostname.split('.')[0] if not hostname.startswith('www.') else hostname.split('.')[1]
@@ -56,12 +55,9 @@ def get_brand_terms(site_url, brand_terms=None, brand_terms_file=None, no_brand_
 
     # 4. Automatic detection
     if not all_brand_terms:
-        hostname = urlparse(site_url).hostname
+        hostname = get_hostname(site_url)
         if not hostname:
-            if site_url.startswith('sc-domain:'):
-                hostname = site_url.replace('sc-domain:', '')
-            else:
-                return set()
+            return set()
 
         suffixes_to_remove = ['.com', '.co.uk', '.org', '.net', '.gov', '.edu', '.io', '.co']
         if hostname.startswith('www.'):
@@ -80,11 +76,23 @@ def get_brand_terms(site_url, brand_terms=None, brand_terms_file=None, no_brand_
 
     return all_brand_terms
 
+def get_brand_pattern(brand_terms):
+    """Builds a case-insensitive regex matching any brand term on word boundaries."""
+    # Use word boundaries for precise matching
+    pattern = r'\b(?:' + '|'.join(re.escape(term) for term in brand_terms) + r')\b'
+    return re.compile(pattern, re.IGNORECASE)
+
 def classify_query(query, brand_terms):
     """Returns True if the query contains any brand terms."""
     if not brand_terms:
         return False
-    
-    # Use word boundaries for precise matching
-    pattern = r'\b(?:' + '|'.join(re.escape(term) for term in brand_terms) + r')\b'
-    return bool(re.search(pattern, query, re.IGNORECASE))
+    return bool(get_brand_pattern(brand_terms).search(query))
+
+def classify_queries(queries, brand_terms):
+    """
+    Vectorised form of classify_query for a Series of queries.
+    Compiles the pattern once and matches the whole column in a single pass.
+    """
+    if not brand_terms:
+        return pd.Series(False, index=queries.index)
+    return queries.str.contains(get_brand_pattern(brand_terms), na=False)
@@ -8,6 +8,7 @@ import json
 import builtins
 import re
 import argparse
+import functools
 
 # Keep reference to original open
 _original_open = builtins.open
@@ -55,6 +56,17 @@ def load_branding_config() -> dict | None:
         print(f"Warning: Failed to load branding configuration from {config_path}: {e}")
         return None
 
+@functools.lru_cache(maxsize=None)
+def _list_doc_files(docs_dir: str) -> tuple:
+    """
+    Returns the Markdown files in docs_dir, longest name first.
+    Uses os.scandir so entry types come from the directory listing without a stat per file,
+    and is cached because the listing is consulted for every HTML file written.
+    """
+    with os.scandir(docs_dir) as entries:
+        names = [e.name for e in entries if e.name.endswith('.md') and e.is_file()]
+    return tuple(sorted(names, key=len, reverse=True))
+
 def find_report_doc_filename(filepath: str) -> str | None:
     """
     Determines the appropriate documentation filename for the running report.
@@ -77,21 +89,19 @@ def find_report_doc_filename(filepath: str) -> str | None:
         html_basename = os.path.basename(filepath).lower()
         html_name = os.path.splitext(html_basename)[0]
         
-        # Sort doc files by length descending so longer matches take precedence
-        doc_files = sorted(os.listdir(docs_dir), key=len, reverse=True)
-        for doc_file in doc_files:
-            if doc_file.endswith('.md'):
-                doc_base = doc_file[:-3] # Remove '.md'
-                doc_parts = doc_base.split('-')
+        # Doc files are sorted by length descending so longer matches take precedence
+        for doc_file in _list_doc_files(docs_dir):
+            doc_base = doc_file[:-3] # Remove '.md'
+            doc_parts = doc_base.split('-')
+            
+            # Ignore trailing 'report' word if there are other parts
+            if len(doc_parts) > 1 and doc_parts[-1] == 'report':
+                match_prefix = '-'.join(doc_parts[:-1])
+            else:
+                match_prefix = doc_base
                 
-                # Ignore trailing 'report' word if there are other parts
-                if len(doc_parts) > 1 and doc_parts[-1] == 'report':
-                    match_prefix = '-'.join(doc_parts[:-1])
-                else:
-                    match_prefix = doc_base
-                    
-                if html_name.startswith(match_prefix):
-                    return doc_file
+            if html_name.startswith(match_prefix):
+                return doc_file
                     
     return None
 
@@ -3,19 +3,44 @@ Unified caching system for GSC Exporter.
 Handles hash-based caching with monthly fragmentation to maximise reusability.
 """
 import os
+import csv
 import hashlib
 import json
 import time
 import socket
 import calendar
 import pandas as pd
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
 from googleapiclient.errors import HttpError
 from core.naming import get_property_name
+from core.client import execute_with_retry, rate_limiter
 
 CACHE_DIR = 'cache'
 
+# Sub-requests per batch. The API accepts more, but larger batches trigger
+# "too many concurrent connections" errors on the GSC side.
+BATCH_SIZE = 50
+
+# GSC keeps revising recent data for a few days, so fragments fetched sooner than
+# this after their period ended are treated as stale and fetched again.
+FINALISED_AFTER_DAYS = 4
+
+# Partial-response mask: only the row fields we store are sent back by the API.
+ROW_FIELDS = 'rows(keys,clicks,impressions,ctr,position)'
+
+# When False, cached fragments are ignored and re-fetched (results are still written back).
+READ_CACHE = True
+
+# Fragments written by this process. They are as fresh as the data gets, so they are
+# trusted for the rest of the run even when unsettled or when cache reads are disabled.
+_fetched_this_run = set()
+
+def set_cache_reads(enabled):
+    """Enables or disables reading existing fragments, e.g. for a --no-cache run."""
+    global READ_CACHE
+    READ_CACHE = enabled
+
 def is_full_month(start, end):
     if start.day != 1:
         return False
@@ -28,14 +53,77 @@ def _get_cache_paths(cache_key, site_url):
     """Returns the CSV and JSON paths for a given cache key within a site subfolder."""
     property_name = get_property_name(site_url)
     site_cache_dir = os.path.join(CACHE_DIR, property_name)
-    
-    if not os.path.exists(site_cache_dir):
-        os.makedirs(site_cache_dir, exist_ok=True)
-        
     csv_path = os.path.join(site_cache_dir, f"{cache_key}.csv")
     json_path = os.path.join(site_cache_dir, f"{cache_key}.json")
     return csv_path, json_path
 
+def _get_cache_key(site_url, start_date, end_date, dimensions, search_type):
+    """Creates a unique key for a specific month/request."""
+    dims = sorted(dimensions)
+    standardised_url = site_url.rstrip('/')
+    cache_key_content = f"{standardised_url}|{start_date}|{end_date}|{','.join(dims)}|{search_type}"
+    return hashlib.md5(cache_key_content.encode()).hexdigest()
+
+def _is_cached(csv_path, json_path, end_date):
+    """
+    Returns True if a fragment exists, cache reads are enabled and the fragment
+    was fetched once the period's data had settled.
+    """
+    if json_path in _fetched_this_run:
+        return os.path.exists(csv_path)
+    if not READ_CACHE or not os.path.exists(csv_path):
+        return False
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            fetched_at = datetime.fromisoformat(json.load(f)['fetched_at'])
+    except (OSError, ValueError, KeyError):
+        # Fragments without readable metadata are trusted as before
+        return True
+    settled_at = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=FINALISED_AFTER_DAYS)
+    return fetched_at >= settled_at
+
+def _is_complete(end_date):
+    """GSC data for today is still changing, so only periods ending before today are cached."""
+    return end_date < date.today().strftime('%Y-%m-%d')
+
+def _save_fragment(df, site_url, start_date, end_date, dimensions, search_type, csv_path, json_path):
+    """Writes a monthly fragment and its metadata to the cache."""
+    if not _is_complete(end_date):
+        return
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    df.to_csv(csv_path, index=False)
+    _save_metadata(site_url, start_date, end_date, dimensions, search_type, json_path)
+
+def _save_metadata(site_url, start_date, end_date, dimensions, search_type, json_path):
+    """Writes the metadata JSON that accompanies a cached fragment."""
+    metadata = {
+        'site_url': site_url,
+        'start_date': start_date,
+        'end_date': end_date,
+        'dimensions': dimensions,
+        'search_type': search_type,
+        'fetched_at': datetime.now().isoformat()
+    }
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=4)
+    _fetched_this_run.add(json_path)
+
+def _rows_to_dataframe(rows, dimensions):
+    """Converts API response rows into a DataFrame with one column per dimension."""
+    # Build the columns directly rather than creating a 'keys' column of lists
+    # and expanding it into a second DataFrame afterwards.
+    metrics = [col for col in ['clicks', 'impressions', 'ctr', 'position'] if col in rows[0]]
+    data = {col: [row.get(col) for row in rows] for col in metrics}
+    for i, dim in enumerate(dimensions):
+        data[dim] = [row['keys'][i] for row in rows]
+    df = pd.DataFrame(data)
+    
+    # Ensure numeric conversion
+    for col in metrics:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+        
+    return df
+
 def _get_monthly_chunks(start_date, end_date):
     """
     Splits a date range into monthly chunks.
@@ -61,67 +149,147 @@ def _get_monthly_chunks(start_date, end_date):
         
     return chunks
 
-def _fetch_from_api(service, site_url, start_date, end_date, dimensions, search_type='web', row_limit=10000, max_rows=None):
-    """Fetches performance data from GSC with pagination and retries."""
+def _fetch_from_api(service, site_url, start_date, end_date, dimensions, search_type='web', row_limit=10000, max_rows=None, csv_path=None):
+    """
+    Fetches performance data from GSC with pagination and retries.
+    If csv_path is given, each page of rows is written straight to that file as it
+    arrives instead of being held in memory, and the DataFrame is read back from it.
+    """
     all_data = []
+    total_rows = 0
     start_row = 0
+    out_file = None
+    writer = None
+    tmp_path = f"{csv_path}.tmp" if csv_path else None
     
-    while True:
-        success = False
-        for attempt in range(3):
-            try:
-                request = {
-                    'startDate': start_date,
-                    'endDate': end_date,
-                    'dimensions': dimensions,
-                    'searchType': search_type,
-                    'rowLimit': row_limit,
-                    'startRow': start_row
-                }
-                start_time = time.time()
-                response = service.searchanalytics().query(siteUrl=site_url, body=request).execute()
-                elapsed = time.time() - start_time
-
-                if 'rows' in response:
-                    rows = response['rows']
-                    all_data.extend(rows)
-                    print(f"    - Retrieved {len(rows)} rows (total: {len(all_data)}) in {elapsed:.2f}s...")
-                    if len(rows) < row_limit:
-                        break
-                    start_row += row_limit
-                    if max_rows and start_row >= max_rows:
-                        print(f"    - Reached maximum row limit of {max_rows} rows. Stopping fetch.")
-                        break
-                else:
+    try:
+        while True:
+            request = {
+                'startDate': start_date,
+                'endDate': end_date,
+                'dimensions': dimensions,
+                'searchType': search_type,
+                'dataState': 'final',
+                'rowLimit': row_limit,
+                'startRow': start_row
+            }
+            response = None
+            for attempt in range(3):
+                try:
+                    start_time = time.time()
+                    response = execute_with_retry(service.searchanalytics().query(siteUrl=site_url, body=request, fields=ROW_FIELDS))
+                    elapsed = time.time() - start_time
                     break
-                success = True
-                break 
-            except (socket.timeout, TimeoutError):
-                print(f"    - Timeout occurred. Retrying (attempt {attempt + 1}/3)...")
-                time.sleep(5 * (attempt + 1))
-            except HttpError as e:
-                print(f"  - An HTTP error occurred: {e}")
-                break 
-        
-        if not success or 'rows' not in response or len(response['rows']) < row_limit:
-            break
+                except (socket.timeout, TimeoutError):
+                    print(f"    - Timeout occurred. Retrying (attempt {attempt + 1}/3)...")
+                    time.sleep(5 * (attempt + 1))
+                except HttpError as e:
+                    print(f"  - An HTTP error occurred: {e}")
+                    break
+
+            rows = response.get('rows', []) if response else []
+            if rows:
+                if csv_path:
+                    if writer is None:
+                        metrics = [col for col in ['clicks', 'impressions', 'ctr', 'position'] if col in rows[0]]
+                        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+                        out_file = open(tmp_path, 'w', newline='', encoding='utf-8')
+                        writer = csv.writer(out_file)
+                        writer.writerow(metrics + dimensions)
+                    writer.writerows([[row.get(col) for col in metrics] + row.get('keys', []) for row in rows])
+                else:
+                    all_data.extend(rows)
+                total_rows += len(rows)
+                print(f"    - Retrieved {len(rows)} rows (total: {total_rows}) in {elapsed:.2f}s...")
+
+            # A short (or failed) page is the last one
+            if len(rows) < row_limit:
+                break
+            start_row += row_limit
+            if max_rows and start_row >= max_rows:
+                print(f"    - Reached maximum row limit of {max_rows} rows. Stopping fetch.")
+                break
+    finally:
+        # Close the partial file even if a request error escapes the loop
+        if out_file:
+            out_file.close()
+
+    if out_file:
+        os.replace(tmp_path, csv_path)
+        return pd.read_csv(csv_path)
             
     if not all_data:
         return pd.DataFrame()
 
-    df = pd.DataFrame(all_data)
-    
-    # Extract dimensions from the 'keys' list if dimensions were requested
-    if dimensions:
-        df[dimensions] = pd.DataFrame(df['keys'].tolist(), index=df.index)
-        df = df.drop(columns=['keys'])
-    
-    # Ensure numeric conversion
-    for col in ['clicks', 'impressions', 'ctr', 'position']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-    return df
+    return _rows_to_dataframe(all_data, dimensions)
+
+def prefetch_with_batch(service, requests, batch_size=BATCH_SIZE, row_limit=10000):
+    """
+    Primes the cache for many small requests using batched API calls.
+    Each request is a (site_url, start_date, end_date, dimensions, search_type) tuple.
+    Monthly fragments that are not cached yet are sent as sub-requests of a single
+    multipart HTTP request, saving a round trip per fragment. Fragments that need
+    pagination or fail are left for fetch_with_cache to retrieve as usual.
+    Returns the set of sites that refused access (403); their remaining
+    sub-requests are dropped and callers can skip them.
+    """
+    pending = []
+    for site_url, start_date, end_date, dimensions, search_type in requests:
+        for chunk_start, chunk_end in _get_monthly_chunks(start_date, end_date):
+            s_str = chunk_start.strftime('%Y-%m-%d')
+            e_str = chunk_end.strftime('%Y-%m-%d')
+            cache_key = _get_cache_key(site_url, s_str, e_str, dimensions, search_type)
+            csv_path, json_path = _get_cache_paths(cache_key, site_url)
+            if not _is_cached(csv_path, json_path, e_str):
+                pending.append((site_url, s_str, e_str, dimensions, search_type, csv_path, json_path))
+
+    denied = set()
+    if not pending:
+        return denied
+
+    print(f"  - Fetching {len(pending)} uncached fragments from GSC API in batches of {batch_size}...")
+
+    def make_callback(job):
+        site_url, s_str, e_str, dimensions, search_type, csv_path, json_path = job
+
+        def callback(request_id, response, exception):
+            if exception is not None:
+                if isinstance(exception, HttpError) and exception.resp.status == 403:
+                    denied.add(site_url)
+                # Rate limits and other errors are retried by fetch_with_cache
+                print(f"    - Batch request failed for {site_url} {s_str} to {e_str}: {exception}")
+                return
+            rows = response.get('rows', [])
+            if rows and len(rows) < row_limit:
+                df = _rows_to_dataframe(rows, dimensions)
+                _save_fragment(df, site_url, s_str, e_str, dimensions, search_type, csv_path, json_path)
+        return callback
+
+    for i in range(0, len(pending), batch_size):
+        jobs = [job for job in pending[i:i + batch_size] if job[0] not in denied]
+        if not jobs:
+            continue
+        batch = service.new_batch_http_request()
+        for job in jobs:
+            site_url, s_str, e_str, dimensions, search_type = job[:5]
+            request = {
+                'startDate': s_str,
+                'endDate': e_str,
+                'dimensions': dimensions,
+                'searchType': search_type,
+                'dataState': 'final',
+                'rowLimit': row_limit,
+                'startRow': 0
+            }
+            batch.add(service.searchanalytics().query(siteUrl=site_url, body=request, fields=ROW_FIELDS), callback=make_callback(job))
+        try:
+            # Each sub-request counts against the quota, so take one token for each
+            rate_limiter.acquire(len(jobs))
+            batch.execute()
+        except HttpError as e:
+            print(f"  - Batch request failed: {e}")
+
+    return denied
 
 def fetch_with_cache(service, site_url, start_date, end_date, dimensions, search_type='web', label=None, max_rows=None):
     """
@@ -131,6 +299,12 @@ def fetch_with_cache(service, site_url, start_date, end_date, dimensions, search
     chunks = _get_monthly_chunks(start_date, end_date)
     all_dfs = []
     
+    # Daily rows carry their own date, so consecutive uncached months can be fetched
+    # with one ranged request and split back into monthly fragments afterwards.
+    # Capped fetches are excluded as the cap would no longer apply per month.
+    coalesce = 'date' in dimensions and not max_rows
+    uncached = []
+    
     property_name = get_property_name(site_url)
     total_chunks = len(chunks)
     for i, (chunk_start, chunk_end) in enumerate(chunks):
@@ -138,12 +312,7 @@ def fetch_with_cache(service, site_url, start_date, end_date, dimensions, search
         e_str = chunk_end.strftime('%Y-%m-%d')
         month_label = chunk_start.strftime('%B %Y')
         
-        # Create a unique key for this specific month/request
-        dims = sorted(dimensions)
-        standardised_url = site_url.rstrip('/')
-        cache_key_content = f"{standardised_url}|{s_str}|{e_str}|{','.join(dims)}|{search_type}"
-        cache_key = hashlib.md5(cache_key_content.encode()).hexdigest()
-        
+        cache_key = _get_cache_key(site_url, s_str, e_str, dimensions, search_type)
         csv_path, json_path = _get_cache_paths(cache_key, site_url)
         
         if is_full_month(chunk_start, chunk_end):
@@ -154,25 +323,41 @@ def fetch_with_cache(service, site_url, start_date, end_date, dimensions, search
         # If a label is provided, prepend it to the date_label
         full_label = f"{label} {date_label}" if label else date_label
         
-        if os.path.exists(csv_path):
+        if _is_cached(csv_path, json_path, e_str):
             print(f"  - [{i+1}/{total_chunks}] {property_name} {full_label}: Using cached data: {cache_key}.")
             chunk_df = pd.read_csv(csv_path)
             all_dfs.append(chunk_df)
+        elif coalesce:
+            uncached.append((i, s_str, e_str, csv_path, json_path))
         else:
             print(f"  - [{i+1}/{total_chunks}] {property_name} {full_label}: Fetching from GSC API: {cache_key}.")
-            chunk_df = _fetch_from_api(service, site_url, s_str, e_str, dimensions, search_type, max_rows=max_rows)
+            # Completed periods are streamed straight into the cache file
+            stream_path = csv_path if _is_complete(e_str) else None
+            chunk_df = _fetch_from_api(service, site_url, s_str, e_str, dimensions, search_type, max_rows=max_rows, csv_path=stream_path)
+            if not chunk_df.empty:
+                if stream_path:
+                    _save_metadata(site_url, s_str, e_str, dimensions, search_type, json_path)
+                all_dfs.append(chunk_df)
+
+    # Group the uncached months into runs of consecutive chunks
+    runs = []
+    for fragment in uncached:
+        if runs and runs[-1][-1][0] == fragment[0] - 1:
+            runs[-1].append(fragment)
+        else:
+            runs.append([fragment])
+
+    for run in runs:
+        run_start, run_end = run[0][1], run[-1][2]
+        prefix = f"{label} " if label else ""
+        print(f"  - [{run[0][0]+1}-{run[-1][0]+1}/{total_chunks}] {property_name} {prefix}{run_start} to {run_end}: Fetching {len(run)} month(s) from GSC API in one request.")
+        run_df = _fetch_from_api(service, site_url, run_start, run_end, dimensions, search_type)
+        if run_df.empty:
+            continue
+        for _, s_str, e_str, csv_path, json_path in run:
+            chunk_df = run_df[(run_df['date'] >= s_str) & (run_df['date'] <= e_str)].reset_index(drop=True)
             if not chunk_df.empty:
-                chunk_df.to_csv(csv_path, index=False)
-                metadata = {
-                    'site_url': site_url,
-                    'start_date': s_str,
-                    'end_date': e_str,
-                    'dimensions': dimensions,
-                    'search_type': search_type,
-                    'fetched_at': datetime.now().isoformat()
-                }
-                with open(json_path, 'w', encoding='utf-8') as f:
-                    json.dump(metadata, f, indent=4)
+                _save_fragment(chunk_df, site_url, s_str, e_str, dimensions, search_type, csv_path, json_path)
                 all_dfs.append(chunk_df)
 
     if not all_dfs:
@@ -209,3 +394,28 @@ def fetch_with_cache(service, site_url, start_date, end_date, dimensions, search
         result_df = result_df.sort_values('clicks', ascending=False)
     
     return result_df
+
+def count_unique(service, site_url, start_date, end_date, dimension, search_type='web'):
+    """
+    Returns the number of distinct values of a single dimension over a date range.
+    Only the dimension column is read back from each cached fragment, skipping the
+    metric parsing, aggregation and sorting that fetch_with_cache would do.
+    """
+    keys = set()
+    for chunk_start, chunk_end in _get_monthly_chunks(start_date, end_date):
+        s_str = chunk_start.strftime('%Y-%m-%d')
+        e_str = chunk_end.strftime('%Y-%m-%d')
+        cache_key = _get_cache_key(site_url, s_str, e_str, [dimension], search_type)
+        csv_path, json_path = _get_cache_paths(cache_key, site_url)
+
+        if not _is_cached(csv_path, json_path, e_str):
+            df = fetch_with_cache(service, site_url, s_str, e_str, [dimension], search_type)
+            if not os.path.exists(csv_path):
+                # Periods that are not cached yet (e.g. still in progress)
+                if not df.empty:
+                    keys.update(df[dimension].astype(str))
+                continue
+
+        values = pd.read_csv(csv_path, usecols=[dimension], dtype={dimension: str}, keep_default_na=False)[dimension]
+        keys.update(values)
+    return len(keys)
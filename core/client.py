@@ -2,11 +2,15 @@
 Core client and authentication logic for GSC Exporter.
 """
 import os
+import time
+import random
 import socket
+import threading
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, Resource
+from googleapiclient.errors import HttpError
 from google.auth import exceptions
 
 # Set global timeout for API requests
@@ -16,8 +20,54 @@ SCOPES = ['https://www.googleapis.com/auth/webmasters.readonly']
 CLIENT_SECRET_FILE = 'config/client_secret.json'
 TOKEN_FILE = 'config/token.json'
 
+# Rate limiting and transient server errors, see execute_with_retry()
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+# Per-thread service objects, see get_thread_service()
+_thread_local = threading.local()
+
+# Service built by get_gsc_service(), reused when several reports run in one process
+_service = None
+
+# Credentials behind _service, used to build the per-thread services
+_credentials = None
+
+class RateLimiter:
+    """
+    Token bucket shared between threads. Allows short bursts of up to `burst`
+    calls, then spaces calls out to `rate` per second.
+    """
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Takes `tokens` calls' worth from the bucket, sleeping until they are available."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            # A negative balance reserves a slot in the future
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+# GSC allows 1,200 queries per minute per user, shared by all worker threads
+rate_limiter = RateLimiter(rate=20, burst=20)
+
 def get_gsc_service():
-    """Authenticates and returns a Google Search Console service object."""
+    """
+    Authenticates and returns a Google Search Console service object.
+    The service is built once per process and reused on later calls.
+    """
+    global _service, _credentials
+    if _service is not None:
+        return _service
+
     creds = None
     if os.path.exists(TOKEN_FILE):
         try:
@@ -50,12 +100,52 @@ def get_gsc_service():
             token.write(creds.to_json())
             print("Authentication successful. Credentials saved.")
 
-    return build('searchconsole', 'v1', credentials=creds)
+    _credentials = creds
+    _service = build('searchconsole', 'v1', credentials=creds, static_discovery=True)
+    return _service
+
+def get_thread_service(service):
+    """
+    Returns a service object that is safe to use from the calling thread.
+    Service objects share a single httplib2.Http instance, which is not thread-safe,
+    so each worker thread gets its own service built from the credentials loaded by
+    get_gsc_service().
+    """
+    if not isinstance(service, Resource) or _credentials is None:
+        # Mocks and services not built by get_gsc_service() are returned unchanged
+        return service
+
+    services = getattr(_thread_local, 'services', None)
+    if services is None:
+        services = _thread_local.services = {}
+
+    key = id(service)
+    if key not in services:
+        services[key] = build('searchconsole', 'v1', credentials=_credentials, static_discovery=True)
+    return services[key]
+
+def execute_with_retry(request, max_attempts=6):
+    """
+    Executes an API request, retrying rate limits and transient server errors
+    with exponential backoff so one failed call does not abort a whole run.
+    Other errors, and the final failure, are raised to the caller.
+    """
+    for attempt in range(max_attempts):
+        rate_limiter.acquire()
+        try:
+            return request.execute()
+        except HttpError as e:
+            if e.resp.status not in RETRYABLE_STATUSES or attempt == max_attempts - 1:
+                raise
+            delay = 2 ** attempt + random.random()
+            reason = "Rate limited" if e.resp.status == 429 else f"Server error ({e.resp.status})"
+            print(f"    - {reason}. Retrying in {delay:.1f}s (attempt {attempt + 1}/{max_attempts})...")
+            time.sleep(delay)
 
 def get_available_properties(service):
     """Fetches all sites (properties) from the GSC API."""
     try:
-        site_list = service.sites().list().execute()
+        site_list = execute_with_retry(service.sites().list())
         if 'siteEntry' in site_list:
             return [entry['siteUrl'] for entry in site_list['siteEntry']]
     except Exception as e:
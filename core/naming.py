@@ -5,6 +5,9 @@ Standardises property-based naming for directories and files.
 import os
 from urllib.parse import urlparse
 
+# Second-level labels that form part of a registrable suffix (e.g. '.co.uk', '.com.au').
+SECOND_LEVEL_LABELS = frozenset({'co', 'com', 'org', 'net', 'gov', 'ac', 'ltd', 'info', 'biz', 'io'})
+
 def get_property_name(site_url: str) -> str:
     """
     Standardises the GSC property name for use in directory names.
@@ -25,6 +28,40 @@ def get_property_name(site_url: str) -> str:
     # Fallback for unexpected formats, ensuring we don't have colons in paths
     return site_url.strip('/').replace(':', '.')
 
+def get_hostname(site_url: str):
+    """
+    Returns the hostname for a GSC property, or None if it cannot be determined.
+    
+    Example:
+        'sc-domain:example.com' -> 'example.com'
+        'https://www.example.com/' -> 'www.example.com'
+    """
+    if site_url.startswith('sc-domain:'):
+        return site_url[len('sc-domain:'):]
+    return urlparse(site_url).hostname
+
+def get_base_domain(site_url: str) -> str:
+    """
+    Returns the base (registrable) domain for a GSC property, used for grouping.
+    
+    Example:
+        'https://blog.example.co.uk/' -> 'example.co.uk'
+        'sc-domain:example.com' -> 'example.com'
+    """
+    if site_url.startswith('sc-domain:'):
+        return site_url[len('sc-domain:'):]
+
+    hostname = urlparse(site_url).hostname
+    if not hostname:
+        return site_url
+
+    parts = hostname.split('.')
+    if len(parts) > 2 and parts[-2] in SECOND_LEVEL_LABELS:
+        return '.'.join(parts[-3:])
+    if len(parts) > 1:
+        return '.'.join(parts[-2:])
+    return hostname
+
 def get_output_dir(site_url: str, base_dir: str = 'output') -> str:
     """
     Returns the output directory path for a given site URL.
@@ -0,0 +1,23 @@
+"""
+Shared Jinja2 template loading for GSC Exporter reports.
+"""
+import os
+from functools import lru_cache
+from jinja2 import Environment, FileSystemLoader
+
+@lru_cache(maxsize=None)
+def _get_environment(directory):
+    # Templates do not change during a run, so skip the per-render modification check
+    return Environment(loader=FileSystemLoader(directory), auto_reload=False)
+
+@lru_cache(maxsize=None)
+def _load_template(directory, name):
+    return _get_environment(directory).get_template(name)
+
+def get_template(name, directory='templates'):
+    """
+    Returns a compiled template, parsing it only once per process.
+    The directory is relative to the current working directory, as the reports
+    are run from the project root.
+    """
+    return _load_template(os.path.abspath(directory), name)
@@ -5,19 +5,22 @@ Consolidates both Search Type performance and Search Appearance performance, hig
 import os
 import sys
 import argparse
+import functools
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
 
 # Add parent directory to sys.path to allow importing core
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.naming import get_output_dir, get_filename_slug
-from core.cache import fetch_with_cache
-from core.client import get_gsc_service, get_available_properties
+from core.templates import get_template
+from core.cache import fetch_with_cache, prefetch_with_batch
+from core.client import get_gsc_service, get_available_properties, get_thread_service
 from core.date_utils import parse_standard_date_args
 from urllib.parse import urlparse
 
+@functools.lru_cache(maxsize=None)
 def get_sort_key(site_url):
     """Creates a hierarchical sort key: root domain -> type -> subdomain."""
     if site_url.startswith('sc-domain:'):
@@ -40,6 +43,9 @@ def get_sort_key(site_url):
         
     return (root_domain, priority, hostname)
 
+# Stands in for the property sections when rendering the page shell
+SECTIONS_MARKER = '<!-- property-sections -->'
+
 SEARCH_TYPES = ['web', 'image', 'video', 'news', 'discover', 'googleNews']
 
 def create_consolidated_html(df_types, df_appearances, date_range_str):
@@ -54,9 +60,11 @@ def create_consolidated_html(df_types, df_appearances, date_range_str):
 
     unique_sites_types = sorted(df_types_disp['site_url'].unique(), key=get_sort_key)
     types_tables_html = []
+    # Split the frame by site in one pass rather than filtering it once per site
+    types_by_site = dict(list(df_types_disp.groupby('site_url', sort=False, observed=True)))
     
     for site in unique_sites_types:
-        site_df = df_types_disp[df_types_disp['site_url'] == site].copy()
+        site_df = types_by_site[site]
         
         # Calculate totals
         tot_clicks = site_df['clicks'].sum()
@@ -116,9 +124,10 @@ def create_consolidated_html(df_types, df_appearances, date_range_str):
 
     unique_sites_apps = sorted(df_apps_disp['site_url'].unique(), key=get_sort_key)
     apps_tables_html = []
+    apps_by_site = dict(list(df_apps_disp.groupby('site_url', sort=False, observed=True)))
     
     for site in unique_sites_apps:
-        site_df = df_apps_disp[df_apps_disp['site_url'] == site].copy()
+        site_df = apps_by_site[site]
         
         # Calculate totals
         tot_clicks = site_df['clicks'].sum()
@@ -248,9 +257,7 @@ def create_consolidated_html(df_types, df_appearances, date_range_str):
     </div>
     """
 
-    template_loader = FileSystemLoader('resources')
-    env = Environment(loader=template_loader)
-    template = env.get_template('report-blank.html')
+    template = get_template('report-blank.html', 'resources')
 
     html_output = template.render(
         title="Consolidated Performance Overview",
@@ -262,8 +269,11 @@ def create_consolidated_html(df_types, df_appearances, date_range_str):
 
     return html_output
 
-def create_property_grouped_html(df_types, df_appearances, date_range_str):
-    """Generates a separate HTML report where each property has its own section containing its search type and appearance tables."""
+def write_property_grouped_html(f, df_types, df_appearances, date_range_str):
+    """
+    Writes a separate HTML report to the open file f, where each property has its own section
+    containing its search type and appearance tables. Sections are streamed to f one at a time.
+    """
     
     df_types_disp = df_types.copy()
     df_types_disp['clicks'] = pd.to_numeric(df_types_disp['clicks'], errors='coerce').fillna(0)
@@ -280,6 +290,8 @@ def create_property_grouped_html(df_types, df_appearances, date_range_str):
     # Get a list of all unique site URLs across both tables
     unique_sites = list(set(df_types_disp['site_url'].unique()) | set(df_apps_disp['site_url'].unique()))
     all_sites = sorted(unique_sites, key=get_sort_key)
+    # Anchor slugs are used by both the navigation links and the section ids
+    anchors = {site: get_filename_slug(site) for site in all_sites}
     
     # 1. Navigation Menu (Three Column List of Links with Subdomain Indentation)
     last_root = None
@@ -296,7 +308,7 @@ def create_property_grouped_html(df_types, df_appearances, date_range_str):
     for chunk in col_chunks:
         chunk_links = []
         for site, indent in chunk:
-            slug = get_filename_slug(site)
+            slug = anchors[site]
             li_class = "mb-1 ps-4" if indent else "mb-1"
             chunk_links.append(f'<li class="{li_class}"><a href="#prop-{slug}" class="text-decoration-none">{site}</a></li>')
         col_htmls.append(f'<ul class="list-unstyled mb-0">{"".join(chunk_links)}</ul>')
@@ -323,14 +335,67 @@ def create_property_grouped_html(df_types, df_appearances, date_range_str):
     </div>
     """
 
-    # 2. Generate Sections for Each Property
-    property_sections = []
+    # 2. Render the page around a marker where the property sections go
+    main_html = f"""
+    <style>
+        .table th, .table td {{
+            text-align: left !important;
+        }}
+        .table th:nth-child(n+2), 
+        .table td:nth-child(n+2) {{
+            text-align: right !important;
+        }}
+        .explanation-card {{
+            background-color: #f8f9fa;
+            border-left: 5px solid #0d6efd;
+            border-radius: 4px;
+            padding: 1.5rem;
+            margin-bottom: 2.5rem;
+        }}
+        .property-section {{
+            transition: all 0.2s ease-in-out;
+        }}
+        .property-section:hover {{
+            box-shadow: 0 0.5rem 1rem rgba(0, 0, 0, 0.15) !important;
+        }}
+    </style>
+
+    <div class="explanation-card shadow-sm">
+        <h4 class="text-primary mb-3">Property-Grouped Performance Overview</h4>
+        <p>This report groups metrics by individual property. For each domain, you can review its search channels and enhanced visual search appearances side by side.</p>
+        <p class="mb-0 text-muted"><em>Please note that Search Appearance data (visual snippets, FAQs, product metadata, etc.) is a subset of Web search traffic and may contain overlap across categories.</em></p>
+    </div>
+
+    {nav_html}
+
+    <div class="property-sections-container mt-4">
+        {SECTIONS_MARKER}
+    </div>
+    """
+
+    template = get_template('report-blank.html', 'resources')
+
+    html_output = template.render(
+        title="Property-Grouped Performance Overview",
+        report_name="Property-Grouped Performance Overview",
+        domain_name="All Properties",
+        date_range=date_range_str,
+        main_content=main_html
+    )
+
+    head, _, tail = html_output.partition(SECTIONS_MARKER)
+    f.write(head)
+
+    # 3. Write each property section as soon as it is built, so only one is held in memory
+    # Split both frames by site in one pass rather than filtering them once per site
+    types_by_site = dict(list(df_types_disp.groupby('site_url', sort=False, observed=True)))
+    apps_by_site = dict(list(df_apps_disp.groupby('site_url', sort=False, observed=True)))
     for site in all_sites:
-        slug = get_filename_slug(site)
+        slug = anchors[site]
         
         # A. Search Type Table
-        site_types_df = df_types_disp[df_types_disp['site_url'] == site].copy()
-        if not site_types_df.empty:
+        site_types_df = types_by_site.get(site)
+        if site_types_df is not None:
             tot_clicks_t = site_types_df['clicks'].sum()
             tot_imps_t = site_types_df['impressions'].sum()
             tot_ctr_t = tot_clicks_t / tot_imps_t if tot_imps_t > 0 else 0
@@ -368,8 +433,8 @@ def create_property_grouped_html(df_types, df_appearances, date_range_str):
             types_table_html = "<p class='text-muted'>No search type data recorded for this property.</p>"
             
         # B. Search Appearance Table
-        site_apps_df = df_apps_disp[df_apps_disp['site_url'] == site].copy()
-        if not site_apps_df.empty:
+        site_apps_df = apps_by_site.get(site)
+        if site_apps_df is not None:
             tot_clicks_a = site_apps_df['clicks'].sum()
             tot_imps_a = site_apps_df['impressions'].sum()
             tot_ctr_a = tot_clicks_a / tot_imps_a if tot_imps_a > 0 else 0
@@ -407,7 +472,7 @@ def create_property_grouped_html(df_types, df_appearances, date_range_str):
             apps_table_html = "<p class='text-muted'>No search appearance data recorded for this property.</p>"
             
         # C. Combined Property Section
-        property_sections.append(f"""
+        f.write(f"""
         <div id="prop-{slug}" class="property-section mb-5 shadow-sm border rounded p-4 bg-white">
             <h3 class="text-primary border-bottom pb-2 mb-4 d-flex justify-content-between align-items-baseline">
                 <span>{site}</span>
@@ -434,59 +499,39 @@ def create_property_grouped_html(df_types, df_appearances, date_range_str):
         </div>
         """)
 
-    # 3. Create main content with explanation
-    main_html = f"""
-    <style>
-        .table th, .table td {{
-            text-align: left !important;
-        }}
-        .table th:nth-child(n+2), 
-        .table td:nth-child(n+2) {{
-            text-align: right !important;
-        }}
-        .explanation-card {{
-            background-color: #f8f9fa;
-            border-left: 5px solid #0d6efd;
-            border-radius: 4px;
-            padding: 1.5rem;
-            margin-bottom: 2.5rem;
-        }}
-        .property-section {{
-            transition: all 0.2s ease-in-out;
-        }}
-        .property-section:hover {{
-            box-shadow: 0 0.5rem 1rem rgba(0, 0, 0, 0.15) !important;
-        }}
-    </style>
 
-    <div class="explanation-card shadow-sm">
-        <h4 class="text-primary mb-3">Property-Grouped Performance Overview</h4>
-        <p>This report groups metrics by individual property. For each domain, you can review its search channels and enhanced visual search appearances side by side.</p>
-        <p class="mb-0 text-muted"><em>Please note that Search Appearance data (visual snippets, FAQs, product metadata, etc.) is a subset of Web search traffic and may contain overlap across categories.</em></p>
-    </div>
-
-    {nav_html}
+    f.write(tail)
 
-    <div class="property-sections-container mt-4">
-        {"".join(property_sections)}
-    </div>
-    """
+def fetch_site(service, site, start_date, end_date):
+    """Fetches the search type totals and search appearance rows for a single site."""
+    print(f"  - Querying {site}...")
+    service = get_thread_service(service)
+    types_dfs = []
+    df_app = None
 
-    template_loader = FileSystemLoader('resources')
-    env = Environment(loader=template_loader)
-    template = env.get_template('report-blank.html')
+    # 1. Query Search Types
+    for st in SEARCH_TYPES:
+        try:
+            df = fetch_with_cache(service, site, start_date, end_date, dimensions=[], search_type=st)
+            if not df.empty:
+                df['site_url'] = site
+                df['search_type'] = st
+                types_dfs.append(df)
+        except Exception as e:
+            print(f"    Error querying search type '{st}' for {site}: {e}")
 
-    html_output = template.render(
-        title="Property-Grouped Performance Overview",
-        report_name="Property-Grouped Performance Overview",
-        domain_name="All Properties",
-        date_range=date_range_str,
-        main_content=main_html
-    )
+    # 2. Query Search Appearances (under the default 'web' search type)
+    try:
+        df = fetch_with_cache(service, site, start_date, end_date, dimensions=['searchAppearance'])
+        if not df.empty:
+            df['site_url'] = site
+            df_app = df
+    except Exception as e:
+        print(f"    Error querying search appearance for {site}: {e}")
 
-    return html_output
+    return types_dfs, df_app
 
-def run_report(service, start_date, end_date):
+def run_report(service, start_date, end_date, workers=8):
     """Retrieves and generates the consolidated report."""
     print("Fetching all properties in the Google Search Console account...")
     sites = get_available_properties(service)
@@ -495,35 +540,30 @@ def run_report(service, start_date, end_date):
         return None
     print(f"Found {len(sites)} properties. Processing performance data...")
 
+    # The search type totals are single-row responses, ideal for batching
+    denied = prefetch_with_batch(service, [(site, start_date, end_date, [], st) for site in sites for st in SEARCH_TYPES])
+    if denied:
+        print(f"  - Skipping {len(denied)} site(s) without access: {', '.join(sorted(denied))}")
+        sites = [site for site in sites if site not in denied]
+        if not sites:
+            print("No accessible properties found.")
+            return None
+
+    # Each site is independent network-bound work, so fetch several at once.
+    # map() keeps the results in the same order as the input sites.
     search_types_data = []
     search_appearance_data = []
-
-    for site in sites:
-        print(f"  - Querying {site}...")
-        
-        # 1. Query Search Types
-        for st in SEARCH_TYPES:
-            try:
-                df = fetch_with_cache(service, site, start_date, end_date, dimensions=[], search_type=st)
-                if not df.empty:
-                    df['site_url'] = site
-                    df['search_type'] = st
-                    search_types_data.append(df)
-            except Exception as e:
-                print(f"    Error querying search type '{st}' for {site}: {e}")
-
-        # 2. Query Search Appearances (under the default 'web' search type)
-        try:
-            df_app = fetch_with_cache(service, site, start_date, end_date, dimensions=['searchAppearance'])
-            if not df_app.empty:
-                df_app['site_url'] = site
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sites)))) as executor:
+        for types_dfs, df_app in executor.map(lambda site: fetch_site(service, site, start_date, end_date), sites):
+            search_types_data.extend(types_dfs)
+            if df_app is not None:
                 search_appearance_data.append(df_app)
-        except Exception as e:
-            print(f"    Error querying search appearance for {site}: {e}")
 
     # Process Search Types
     if search_types_data:
         df_types_combined = pd.concat(search_types_data, ignore_index=True)
+        # Few distinct sites over many rows: sort and group on category codes, not strings
+        df_types_combined['site_url'] = df_types_combined['site_url'].astype('category')
         df_types_combined = df_types_combined.sort_values(by=['site_url', 'clicks'], ascending=[True, False])
     else:
         df_types_combined = pd.DataFrame(columns=['site_url', 'search_type', 'clicks', 'impressions', 'ctr', 'position'])
@@ -531,6 +571,7 @@ def run_report(service, start_date, end_date):
     # Process Search Appearances
     if search_appearance_data:
         df_apps_combined = pd.concat(search_appearance_data, ignore_index=True)
+        df_apps_combined['site_url'] = df_apps_combined['site_url'].astype('category')
         df_apps_combined = df_apps_combined.sort_values(by=['site_url', 'clicks'], ascending=[True, False])
     else:
         df_apps_combined = pd.DataFrame(columns=['site_url', 'searchAppearance', 'clicks', 'impressions', 'ctr', 'position'])
@@ -556,9 +597,8 @@ def run_report(service, start_date, end_date):
         f.write(html_content)
 
     # Save HTML (By Property)
-    html_prop_content = create_property_grouped_html(df_types_combined, df_apps_combined, f"{start_date} to {end_date}")
     with open(html_prop_path, 'w', encoding='utf-8') as f:
-        f.write(html_prop_content)
+        write_property_grouped_html(f, df_types_combined, df_apps_combined, f"{start_date} to {end_date}")
 
     print(f"\nCSV (Search Types) saved to: {csv_types_path}")
     print(f"CSV (Search Appearances) saved to: {csv_apps_path}")
@@ -573,6 +613,7 @@ if __name__ == '__main__':
     parser.add_argument('--end-date', help='End date (YYYY-MM-DD).')
     parser.add_argument('--last-7-days', action='store_true', help='Run for the last 7 available days.')
     parser.add_argument('--last-month', action='store_true', help='Run for the last calendar month.')
+    parser.add_argument('--workers', type=int, default=8, help='Number of properties to fetch concurrently (default 8).')
 
     args = parser.parse_args()
 
@@ -589,4 +630,4 @@ if __name__ == '__main__':
                 sys.exit(1)
         
         start_date, end_date = parse_standard_date_args(args, service, anchor_site)
-        run_report(service, start_date, end_date)
+        run_report(service, start_date, end_date, workers=args.workers)
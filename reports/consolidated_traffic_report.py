@@ -4,7 +4,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import pandas as pd
 from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
-from jinja2 import Environment, FileSystemLoader
+from core.templates import get_template
 from core.naming import get_output_dir, get_filename_slug
 from core.cache import fetch_with_cache
 from core.date_utils import parse_standard_date_args, get_month_range_lookback
@@ -65,11 +65,11 @@ def generate_html_report(df, site_url, html_output_path):
     monthly_imps_table = df_fmt[['month', 'web_impressions', 'discover_impressions', 'news_impressions', 'total_impressions']].style.set_table_attributes('class="table table-bordered table-sm"').set_table_styles(styles).hide(axis='index').to_html()
     data_table = df_fmt.style.set_table_attributes('class="dataframe table table-striped table-hover"').set_table_styles(styles).hide(axis='index').to_html()
 
-    chart_data = df.sort_values('month').to_json(orient='records')
+    # Only the columns the charts read are embedded in the page
+    chart_columns = [c for c in df.columns if c == 'month' or c.endswith(('_clicks', '_impressions'))]
+    chart_data = df.sort_values('month')[chart_columns].to_json(orient='records')
 
-    template_loader = FileSystemLoader('templates')
-    env = Environment(loader=template_loader)
-    template = env.get_template('consolidated-traffic-report-template.html')
+    template = get_template('consolidated-traffic-report-template.html')
 
     html_content = template.render(
         site_url=site_url,
@@ -99,12 +99,14 @@ def run_report(service, site_url, start_date, end_date):
     def process_to_monthly(df, search_type):
         if df.empty:
             return pd.DataFrame(columns=['month', f'{search_type}_clicks', f'{search_type}_impressions'])
-        df['date'] = pd.to_datetime(df['date'])
-        df['month'] = df['date'].dt.strftime('%Y-%m')
+        df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
+        df['month'] = df['date'].values.astype('datetime64[M]')
         agg = df.groupby('month').agg({
             'clicks': 'sum',
             'impressions': 'sum'
         }).reset_index()
+        # Format the month labels once per month rather than once per day
+        agg['month'] = agg['month'].dt.strftime('%Y-%m')
         agg.rename(columns={'clicks': f'{search_type}_clicks', 'impressions': f'{search_type}_impressions'}, inplace=True)
         return agg
 
@@ -7,6 +7,7 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import json
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from core.naming import get_output_dir, get_filename_slug
@@ -989,27 +990,36 @@ def run_report(service, site_url, start_date, end_date, search_type='discover',
         return None
 
     # Sort and compute daily rankings
-    df['date_dt'] = pd.to_datetime(df['date'])
+    df['date_dt'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
     df_sorted = df.sort_values(by=['date_dt', 'clicks'], ascending=[True, False])
-    df_sorted['rank'] = df_sorted.groupby('date').cumcount() + 1
+    df['rank'] = df_sorted.groupby('date').cumcount() + 1
+
+    # Encode pages and dates once; every per-page and per-day total below is a
+    # np.bincount over these codes rather than a separate groupby
+    page_codes, page_labels = pd.factorize(df['page'])
+    date_codes, date_labels = pd.factorize(df['date'], sort=True)
+    clicks = df['clicks'].to_numpy(dtype='float64')
+    impressions = df['impressions'].to_numpy(dtype='float64')
     
-    # 2. Extract unique pages that hit the top X popular list on at least one day
-    df_popular_only = df_sorted[df_sorted['rank'] <= top_stories].copy()
-    popular_pages = df_popular_only['page'].unique()
-    
-    # Count how many days each page was "popular" (rank <= top_stories)
-    popular_days_count = df_popular_only.groupby('page')['date'].nunique().to_dict()
-
-    # Filter original data to include only the popular pages
-    df_matrix_source = df[df['page'].isin(popular_pages)].copy()
+    # 2. Count how many days each page was "popular" (rank <= top_stories).
+    # Each (date, page) pair appears once, so counting rows counts days.
+    is_popular = (df['rank'] <= top_stories).to_numpy()
+    popular_days = np.bincount(page_codes[is_popular], minlength=len(page_labels))
+    popular_days_count = dict(zip(page_labels[popular_days > 0], popular_days[popular_days > 0]))
+    page_clicks = pd.Series(np.bincount(page_codes, weights=clicks, minlength=len(page_labels)).astype('int64'), index=page_labels)
+    page_impressions = pd.Series(np.bincount(page_codes, weights=impressions, minlength=len(page_labels)).astype('int64'), index=page_labels)
+
+    # Filter original data to include only the pages that were popular on at least one day
+    df_matrix_source = df[popular_days[page_codes] > 0].copy()
     
     # 3. Create Daily Totals for Chart
-    df_daily = df.groupby('date').agg({
-        'clicks': 'sum',
-        'impressions': 'sum'
-    }).reset_index()
+    df_daily = pd.DataFrame({
+        'date': date_labels,
+        'clicks': np.bincount(date_codes, weights=clicks).astype('int64'),
+        'impressions': np.bincount(date_codes, weights=impressions).astype('int64')
+    })
     df_daily['ctr'] = df_daily['clicks'] / df_daily['impressions']
-    df_daily['date_dt'] = pd.to_datetime(df_daily['date'])
+    df_daily['date_dt'] = pd.to_datetime(df_daily['date'], format='%Y-%m-%d')
     
     # Backfill missing dates to ensure smooth chronological lines
     start_dt = pd.to_datetime(start_date)
@@ -1032,10 +1042,10 @@ def run_report(service, site_url, start_date, end_date, search_type='discover',
     
     # Map Popular Days count and Total clicks/impressions
     clicks_pivot['Popular Days'] = clicks_pivot.index.map(popular_days_count).fillna(0).astype(int)
-    clicks_pivot['Total Clicks'] = df_matrix_source.groupby('page')['clicks'].sum()
+    clicks_pivot['Total Clicks'] = page_clicks
     
     impressions_pivot['Popular Days'] = impressions_pivot.index.map(popular_days_count).fillna(0).astype(int)
-    impressions_pivot['Total Impressions'] = df_matrix_source.groupby('page')['impressions'].sum()
+    impressions_pivot['Total Impressions'] = page_impressions
     
     # Sort by popularity days count (descending) then by metric totals
     clicks_pivot = clicks_pivot.sort_values(by=['Popular Days', 'Total Clicks'], ascending=[False, False])
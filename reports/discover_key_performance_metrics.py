@@ -11,6 +11,7 @@ from dateutil.relativedelta import relativedelta
 from core.naming import get_output_dir, get_filename_slug
 from core.cache import fetch_with_cache
 from core.date_utils import parse_standard_date_args
+from core.templates import get_template
 
 def create_single_site_html_report(df, report_title, full_period_str):
     """Generates a simplified HTML report for a single site, including a chart."""
@@ -23,110 +24,17 @@ def create_single_site_html_report(df, report_title, full_period_str):
     df_table['ctr'] = df_table['ctr'].apply(lambda x: f"{x:.2%}")
     
     report_body = df_table.to_html(classes="table table-striped table-hover", index=False, border=0)
-    chart_data = df.sort_values(by='month').to_json(orient='records')
+    # Only the columns the chart reads are embedded in the page
+    chart_data = df.sort_values(by='month')[['month', 'clicks', 'impressions']].to_json(orient='records')
 
-    return f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Google Discover Performance Report for {report_title}</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css" rel="stylesheet">
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        body {{ padding-top: 56px; }}
-        h1 {{ padding-bottom: .5rem; }}
-        h2 {{ border-bottom: 2px solid #dee2e6; padding-bottom: .5rem; margin-top: 2rem; }}
-        .table thead th {{ background-color: #434343; color: #ffffff; text-align: left; }}
-        footer {{ margin-top: 3rem; text-align: center; color: #6c757d; }}
-    </style>
-</head>
-<body>
-    <header class="navbar navbar-expand-lg navbar-light bg-light border-bottom mb-4 fixed-top">
-        <div class="container-fluid">
-            <h1 class="h3 mb-0">Google Discover Performance Report for {report_title}</h1>
-        </div>
-    </header>
-    <main class="container-fluid py-4 flex-grow-1">
-        <p class="text-muted">Analysis for the period: {full_period_str}</p>
-        <div class="card my-4">
-            <div class="card-header"><h3>Clicks vs. Impressions</h3></div>
-            <div class="card-body" style="height: 400px;"><canvas id="performanceChart"></canvas></div>
-        </div>
-        <h2>Data Table</h2>
-        <div class="table-responsive">{report_body}</div>
-    </main>
-    <footer class="footer mt-auto py-3 bg-light">
-        <div class="container text-center">
-            <span class="text-muted">Report generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}. <a href="https://github.com/liamdelahunty/gsc-exporter" target="_blank">gsc-exporter</a></span>
-        </div>
-    </footer>
-    <script>
-        const data = {chart_data};
-        const labels = data.map(row => row.month);
-
-        new Chart(document.getElementById('performanceChart'), {{
-            type: 'line',
-            data: {{
-                labels: labels,
-                datasets: [
-                    {{
-                        label: 'Clicks',
-                        data: data.map(row => row.clicks),
-                        borderColor: 'rgba(54, 162, 235, 1)',
-                        backgroundColor: 'rgba(54, 162, 235, 0.2)',
-                        yAxisID: 'yClicks',
-                        fill: false,
-                        tension: 0.1
-                    }},
-                    {{
-                        label: 'Impressions',
-                        data: data.map(row => row.impressions),
-                        borderColor: 'rgba(255, 99, 132, 1)',
-                        backgroundColor: 'rgba(255, 99, 132, 0.2)',
-                        yAxisID: 'yImpressions',
-                        fill: false,
-                        tension: 0.1
-                    }}
-                ]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                interaction: {{
-                    mode: 'index',
-                    intersect: false,
-                }},
-                scales: {{
-                    yClicks: {{
-                        type: 'linear',
-                        display: true,
-                        position: 'left',
-                        title: {{
-                            display: true,
-                            text: 'Clicks'
-                        }}
-                    }},
-                    yImpressions: {{
-                        type: 'linear',
-                        display: true,
-                        position: 'right',
-                        title: {{
-                            display: true,
-                            text: 'Impressions'
-                        }},
-                        grid: {{
-                            drawOnChartArea: false,
-                        }}
-                    }}
-                }}
-            }}
-        }});
-    </script>
-</body>
-</html>
-"""
+    template = get_template('discover-key-performance-metrics-template.html')
+    return template.render(
+        report_title=report_title,
+        full_period_str=full_period_str,
+        report_body=report_body,
+        chart_data=chart_data,
+        generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    )
 
 def run_report(service, site_url, start_date, end_date, months=16):
     """Executes the Discover performance metrics report."""
@@ -140,7 +48,7 @@ def run_report(service, site_url, start_date, end_date, months=16):
         return None
 
     # 3. Process to Monthly
-    df['month_date'] = pd.to_datetime(df['date'])
+    df['month_date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
     df['month'] = df['month_date'].dt.strftime('%Y-%m')
     
     monthly_df = df.groupby('month').agg({
@@ -152,7 +60,7 @@ def run_report(service, site_url, start_date, end_date, months=16):
     monthly_df = monthly_df.sort_values('month', ascending=False)
     
     # Add date object back for chart sorting if needed
-    monthly_df['month_date'] = pd.to_datetime(monthly_df['month'])
+    monthly_df['month_date'] = pd.to_datetime(monthly_df['month'], format='%Y-%m')
 
     # 4. Output Paths
     output_dir = get_output_dir(site_url)
@@ -5,14 +5,15 @@ Refactored for modular GSC Exporter.
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
 import pandas as pd
 import re
 from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
-from jinja2 import Environment, FileSystemLoader
-from core.naming import get_output_dir, get_filename_slug
-from core.cache import fetch_with_cache
-from core.brand import get_brand_terms, classify_query
+from core.templates import get_template
+from core.naming import get_output_dir, get_filename_slug, get_hostname
+from core.cache import fetch_with_cache, set_cache_reads
+from core.brand import get_brand_terms, classify_queries
 from core.date_utils import parse_standard_date_args, get_month_range_lookback
 
 def generate_wrapped_narrative(wrapped_data):
@@ -50,7 +51,28 @@ def generate_wrapped_narrative(wrapped_data):
         narratives['busiest_month'] = "No busiest month could be identified."
     return narratives
 
-def run_report(service, site_url, start_date, end_date, brand_terms=None):
+def summarise_months(df_daily):
+    """
+    Aggregates daily rows by calendar month: clicks and impressions are summed,
+    ctr and position averaged. Months are integer codes from a datetime64[M] cast,
+    so a single np.bincount pass per metric replaces a hashed groupby.
+    """
+    months = pd.to_datetime(df_daily['date'], format='%Y-%m-%d').values.astype('datetime64[M]').astype('int64')
+    first_month = months.min()
+    codes = months - first_month
+    counts = np.bincount(codes)
+    present = counts > 0
+    sums = {col: np.bincount(codes, weights=df_daily[col].to_numpy(dtype='float64'))[present]
+            for col in ['clicks', 'impressions', 'ctr', 'position']}
+    index = pd.DatetimeIndex((np.flatnonzero(present) + first_month).astype('datetime64[M]'), name='month')
+    return pd.DataFrame({
+        'clicks': sums['clicks'].astype('int64'),
+        'impressions': sums['impressions'].astype('int64'),
+        'ctr': sums['ctr'] / counts[present],
+        'position': sums['position'] / counts[present]
+    }, index=index)
+
+def run_report(service, site_url, start_date, end_date, brand_terms=None, output_format='csv'):
     """Executes the GSC Wrapped report."""
     print(f"Running GSC Wrapped Report for {site_url} ({start_date} to {end_date})...")
     
@@ -76,67 +98,51 @@ def run_report(service, site_url, start_date, end_date, brand_terms=None):
     unique_pages_str = f"{unique_pages:,}"
     unique_queries_str = f"{unique_queries:,}"
 
-    top_pages_list = [{'url': row['page'], 'clicks': row['clicks']} for _, row in df_pages.head(5).iterrows()]
+    top_pages_list = df_pages.head(5)[['page', 'clicks']].rename(columns={'page': 'url'}).to_dict('records')
     
     # Brand Logic
     if brand_terms is None:
         brand_terms = get_brand_terms(site_url)
     
     if brand_terms:
-        df_queries['is_brand'] = df_queries['query'].apply(lambda x: classify_query(x, brand_terms))
+        df_queries['is_brand'] = classify_queries(df_queries['query'], brand_terms)
         
         top_brand = df_queries[df_queries['is_brand']].head(5)
         top_non_brand = df_queries[~df_queries['is_brand']].head(5)
         
-        top_brand_queries = [{'query': r['query'], 'clicks': r['clicks']} for _, r in top_brand.iterrows()]
-        top_non_brand_queries = [{'query': r['query'], 'clicks': r['clicks']} for _, r in top_non_brand.iterrows()]
+        top_brand_queries = top_brand[['query', 'clicks']].to_dict('records')
+        top_non_brand_queries = top_non_brand[['query', 'clicks']].to_dict('records')
     else:
         top_brand_queries = []
-        top_non_brand_queries = [{'query': r['query'], 'clicks': r['clicks']} for _, r in df_queries.head(5).iterrows()]
+        top_non_brand_queries = df_queries.head(5)[['query', 'clicks']].to_dict('records')
 
     top_query = top_non_brand_queries[0]['query'] if top_non_brand_queries else (top_brand_queries[0]['query'] if top_brand_queries else "N/A")
     top_query_clicks = top_non_brand_queries[0]['clicks'] if top_non_brand_queries else (top_brand_queries[0]['clicks'] if top_brand_queries else 0)
 
     # Busiest Months for other metrics
+    most_clicked_month, most_clicked_month_clicks = "N/A", 0
     most_impressed_month, most_impressed_month_impressions = "N/A", 0
     highest_ctr_month, highest_ctr_month_ctr = "N/A", 0
     best_position_month, best_position_month_position = "N/A", 0
 
     if not df_daily.empty:
-        df_daily['month_date'] = pd.to_datetime(df_daily['date'])
-        df_daily['month_name'] = df_daily['month_date'].dt.strftime('%B')
-        
-        monthly_agg = df_daily.groupby('month_name').agg({
-            'clicks': 'sum',
-            'impressions': 'sum',
-            'ctr': 'mean',
-            'position': 'mean'
-        }).reset_index()
-
-        top_month_clicks = monthly_agg.nlargest(1, 'clicks')
-        if not top_month_clicks.empty:
-            most_clicked_month = top_month_clicks.iloc[0]['month_name']
-            most_clicked_month_clicks = top_month_clicks.iloc[0]['clicks']
-
-        top_month_imps = monthly_agg.nlargest(1, 'impressions')
-        if not top_month_imps.empty:
-            most_impressed_month = top_month_imps.iloc[0]['month_name']
-            most_impressed_month_impressions = top_month_imps.iloc[0]['impressions']
-
-        top_month_ctr = monthly_agg.nlargest(1, 'ctr')
-        if not top_month_ctr.empty:
-            highest_ctr_month = top_month_ctr.iloc[0]['month_name']
-            highest_ctr_month_ctr = top_month_ctr.iloc[0]['ctr']
+        monthly_agg = summarise_months(df_daily)
+
+        most_clicked_month = monthly_agg['clicks'].idxmax().strftime('%B')
+        most_clicked_month_clicks = monthly_agg['clicks'].max()
+
+        most_impressed_month = monthly_agg['impressions'].idxmax().strftime('%B')
+        most_impressed_month_impressions = monthly_agg['impressions'].max()
+
+        highest_ctr_month = monthly_agg['ctr'].idxmax().strftime('%B')
+        highest_ctr_month_ctr = monthly_agg['ctr'].max()
 
         # Lowest position is best
-        top_month_pos = monthly_agg.nsmallest(1, 'position')
-        if not top_month_pos.empty:
-            best_position_month = top_month_pos.iloc[0]['month_name']
-            best_position_month_position = top_month_pos.iloc[0]['position']
+        best_position_month = monthly_agg['position'].idxmin().strftime('%B')
+        best_position_month_position = monthly_agg['position'].min()
 
     # 4. Final Data Object
-    from urllib.parse import urlparse
-    hostname = urlparse(site_url).hostname or site_url
+    hostname = get_hostname(site_url) or site_url
 
     wrapped_data = {
         'site_url': site_url,
@@ -170,9 +176,7 @@ def run_report(service, site_url, start_date, end_date, brand_terms=None):
     # 5. Render Template
     # Template loader expects 'templates' dir to be relative to the script or CWD
     # interactive-runner runs from project root.
-    template_loader = FileSystemLoader('templates')
-    env = Environment(loader=template_loader)
-    template = env.get_template('gsc-wrapped-template.html')
+    template = get_template('gsc-wrapped-template.html')
     html_output = template.render(wrapped_data=wrapped_data, narratives=narratives)
 
     # 6. Output Paths
@@ -183,24 +187,32 @@ def run_report(service, site_url, start_date, end_date, brand_terms=None):
     html_filename = f"gsc-wrapped-{slug}-{start_date}-to-{end_date}.html"
     html_output_path = os.path.join(output_dir, html_filename)
 
-    csv_pages_filename = f"gsc-wrapped-{slug}-pages-{start_date}-to-{end_date}.csv"
-    csv_queries_filename = f"gsc-wrapped-{slug}-queries-{start_date}-to-{end_date}.csv"
-    csv_pages_path = os.path.join(output_dir, csv_pages_filename)
-    csv_queries_path = os.path.join(output_dir, csv_queries_filename)
+    pages_filename = f"gsc-wrapped-{slug}-pages-{start_date}-to-{end_date}.{output_format}"
+    queries_filename = f"gsc-wrapped-{slug}-queries-{start_date}-to-{end_date}.{output_format}"
+    pages_path = os.path.join(output_dir, pages_filename)
+    queries_path = os.path.join(output_dir, queries_filename)
 
     with open(html_output_path, 'w', encoding='utf-8') as f:
         f.write(html_output)
     
-    df_pages.to_csv(csv_pages_path, index=False, encoding='utf-8')
-    df_queries.to_csv(csv_queries_path, index=False, encoding='utf-8')
+    if output_format == 'parquet':
+        # Categorical page/query columns are stored dictionary-encoded, which keeps the files small
+        for df, path, col in [(df_pages, pages_path, 'page'), (df_queries, queries_path, 'query')]:
+            if col in df.columns:
+                df = df.astype({col: 'category'})
+            df.to_parquet(path, index=False, compression='snappy')
+    else:
+        df_pages.to_csv(pages_path, index=False, encoding='utf-8')
+        df_queries.to_csv(queries_path, index=False, encoding='utf-8')
         
-    print(f"CSV saved to: {csv_pages_path}")
-    print(f"CSV saved to: {csv_queries_path}")
+    print(f"{output_format.upper()} saved to: {pages_path}")
+    print(f"{output_format.upper()} saved to: {queries_path}")
     print(f"HTML saved to: {html_output_path}")
     return html_output_path
 
 if __name__ == '__main__':
     import argparse
+    import importlib.util
     from core.client import get_gsc_service
     
     parser = argparse.ArgumentParser(description='Generate GSC Wrapped report.')
@@ -210,8 +222,15 @@ if __name__ == '__main__':
     parser.add_argument('--last-7-days', action='store_true', help='Run for the last 7 available days.')
     parser.add_argument('--last-month', action='store_true', help='Run for the last calendar month.')
     parser.add_argument('--last-12-months', action='store_true', help='Run for the last 12 months.')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help='Format for the page and query exports (default csv). Parquet requires pyarrow.')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore cached data and re-fetch from the GSC API.')
     
     args = parser.parse_args()
+    if args.no_cache:
+        set_cache_reads(False)
+    if args.format == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        print("Error: --format parquet requires pyarrow. Install it with 'pip install pyarrow'.")
+        sys.exit(1)
     
     service = get_gsc_service()
     if not service:
@@ -229,4 +248,4 @@ if __name__ == '__main__':
             today = date.today()
             start_date = f"{today.year}-01-01"
 
-    run_report(service, args.site_url, start_date, end_date)
+    run_report(service, args.site_url, start_date, end_date, output_format=args.format)
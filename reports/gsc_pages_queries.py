@@ -11,7 +11,7 @@ from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
 from core.naming import get_output_dir, get_filename_slug
 from core.cache import fetch_with_cache
-from core.brand import get_brand_terms, classify_query
+from core.brand import get_brand_terms, classify_queries
 from core.date_utils import parse_standard_date_args
 
 def generate_accordion_html(df, primary_dim, secondary_dim, report_limit, sub_table_limit, accordion_suffix=""):
@@ -19,7 +19,11 @@ def generate_accordion_html(df, primary_dim, secondary_dim, report_limit, sub_ta
     accordion_id = f"accordion-{primary_dim}{accordion_suffix}"
     html_parts = [f'<div class="accordion mt-3" id="{accordion_id}">']
 
-    primary_totals = df.groupby(primary_dim).agg(
+    # Every accordion item filters the full frame by its primary value, so encode the
+    # column as categorical once and compare integer codes rather than strings.
+    df = df.assign(**{primary_dim: df[primary_dim].astype('category')})
+
+    primary_totals = df.groupby(primary_dim, observed=True).agg(
         total_clicks=('clicks', 'sum'),
         total_impressions=('impressions', 'sum')
     ).sort_values(by='total_clicks', ascending=False).head(report_limit).reset_index()
@@ -96,7 +100,7 @@ def create_html_report(data_df, site_url, start_date, end_date, report_limit, su
     """
 
     if has_brands:
-        data_df['is_brand'] = data_df['query'].apply(lambda x: classify_query(x, brand_terms))
+        data_df['is_brand'] = classify_queries(data_df['query'], brand_terms)
         brand_df = data_df[data_df['is_brand']].copy()
         non_brand_df = data_df[~data_df['is_brand']].copy()
         
@@ -7,21 +7,15 @@ import json
 from datetime import datetime
 from core.naming import get_output_dir, get_filename_slug
 from core.date_utils import parse_standard_date_args
-from jinja2 import Environment, FileSystemLoader
+from core.templates import get_template
+from core.tables import render_html_table, format_columns
 
 def create_historical_report(df, report_title, site_url):
     """Generates a historical HTML report."""
     
-    # --- Data Preparation ---
-    report_df = df.copy()
-    report_df['clicks'] = report_df['clicks'].apply(lambda x: f"{x:,.0f}")
-    report_df['impressions'] = report_df['impressions'].apply(lambda x: f"{x:,.0f}")
-    report_df['ctr'] = report_df['ctr'].apply(lambda x: f"{x:.2%}")
-    report_df['position'] = report_df['position'].apply(lambda x: f"{x:,.2f}")
-    report_df['queries'] = report_df['queries'].apply(lambda x: f"{x:,.0f}")
-    report_df['pages'] = report_df['pages'].apply(lambda x: f"{x:,.0f}")
-
-    report_df = report_df.rename(columns={
+    # --- Table ---
+    table_df = format_columns(df[['month', 'clicks', 'impressions', 'ctr', 'position', 'queries', 'pages']])
+    table_df = table_df.rename(columns={
         'month': 'Month',
         'clicks': 'Total Clicks',
         'impressions': 'Impressions',
@@ -30,11 +24,7 @@ def create_historical_report(df, report_title, site_url):
         'queries': '# Queries',
         'pages': '# Pages'
     })
-
-    final_columns = ['Month', 'Total Clicks', 'Impressions', 'CTR', 'Avg. Position', '# Queries', '# Pages']
-    report_df = report_df[final_columns]
-    
-    table_html = report_df.to_html(classes="table table-striped table-hover", index=False, border=0)
+    table_html = render_html_table(table_df)
 
     # --- Chart Generation ---
     chart_labels = json.dumps(df['month'].tolist())
@@ -119,9 +109,7 @@ def create_historical_report(df, report_title, site_url):
     </script>
     """
 
-    template_loader = FileSystemLoader('resources')
-    env = Environment(loader=template_loader)
-    template = env.get_template('report-blank.html')
+    template = get_template('report-blank.html', 'resources')
 
     html_output = template.render(
         title=report_title,
@@ -173,7 +161,8 @@ def run_report(site_url):
         # (Assuming the monthly summary has at least one date or we can infer it)
         # For now, let's just fail gracefully with a better message if we can't find it.
         if 'date' in df.columns:
-            df['month'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m')
+            # Files on disk may have been edited, so accept any ISO 8601 date or datetime
+            df['month'] = pd.to_datetime(df['date'], format='ISO8601').dt.strftime('%Y-%m')
         else:
              print("Error: Could not find 'month' or 'date' column in CSV files.")
              return None
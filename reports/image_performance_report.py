@@ -157,12 +157,13 @@ def run_report(service, site_url, start_date, end_date):
     df_history_raw = fetch_with_cache(service, site_url, history_start, end_date, ['date'], 'image')
     
     if not df_history_raw.empty:
-        df_history_raw['date'] = pd.to_datetime(df_history_raw['date'])
-        df_history = df_history_raw.groupby(df_history_raw['date'].dt.to_period('M')).agg({
+        df_history_raw['date'] = pd.to_datetime(df_history_raw['date'], format='%Y-%m-%d')
+        df_history_raw['date'] = df_history_raw['date'].values.astype('datetime64[M]')
+        df_history = df_history_raw.groupby('date').agg({
             'clicks': 'sum',
             'impressions': 'sum'
         }).reset_index()
-        df_history['month'] = df_history['date'].astype(str)
+        df_history['month'] = df_history['date'].dt.strftime('%Y-%m')
     else:
         df_history = pd.DataFrame(columns=['month', 'clicks', 'impressions'])
 
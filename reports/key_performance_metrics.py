@@ -10,7 +10,9 @@ from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
 from core.naming import get_output_dir, get_filename_slug
 from core.cache import fetch_with_cache
+from core.tables import format_columns
 from core.date_utils import parse_standard_date_args
+from core.templates import get_template
 
 def create_single_site_html_report(df, report_title, full_period_str):
     """Generates a simplified HTML report for a single site, including a chart."""
@@ -18,69 +20,19 @@ def create_single_site_html_report(df, report_title, full_period_str):
     if 'month_date' in df_table.columns:
         df_table = df_table.drop(columns=['month_date'])
     
-    df_table['clicks'] = df_table['clicks'].apply(lambda x: f"{x:,.0f}")
-    df_table['impressions'] = df_table['impressions'].apply(lambda x: f"{x:,.0f}")
-    df_table['ctr'] = df_table['ctr'].apply(lambda x: f"{x:.2%}")
-    df_table['position'] = df_table['position'].apply(lambda x: f"{x:.2f}")
+    df_table = format_columns(df_table)
     
     report_body = df_table.to_html(classes="table table-striped table-hover", index=False, border=0)
-    chart_data = df.sort_values(by='month').to_json(orient='records')
+    # Only the columns the chart reads are embedded in the page
+    chart_data = df.sort_values(by='month')[['month', 'clicks', 'impressions']].to_json(orient='records')
 
-    return f"""
-<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>Google Organic Performance Report for {report_title}</title><link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css" rel="stylesheet">
-<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-<style>body{{padding:2rem;}}h1,h2{{border-bottom:2px solid #dee2e6;padding-bottom:.5rem;margin-top:2rem;}}.table thead th {{background-color: #434343;color: #ffffff;text-align: left;}}footer{{margin-top:3rem;text-align:center;color:#6c757d;}}</style></head>
-<body><div class="container-fluid"><h1>Google Organic Performance Report for {report_title}</h1>
-<p class="text-muted">{full_period_str}</p>
-<div class="card my-4">
-  <div class="card-header"><h3>Clicks vs. Impressions</h3></div>
-  <div class="card-body"><canvas id="performanceChart"></canvas></div>
-</div>
-<h2>Data Table</h2>
-<div class="table-responsive">{report_body}</div></div>
-<footer><p><a href="https://github.com/liamdelahunty/gsc-exporter" target="_blank">gsc-exporter</a></p></footer>
-<script>
-    const data = {chart_data};
-    const labels = data.map(row => row.month);
-
-    new Chart(document.getElementById('performanceChart'), {{
-        type: 'line',
-        data: {{
-            labels: labels,
-            datasets: [
-                {{
-                    label: 'Clicks',
-                    data: data.map(row => row.clicks),
-                    borderColor: 'rgba(54, 162, 235, 1)',
-                    backgroundColor: 'rgba(54, 162, 235, 0.2)',
-                    yAxisID: 'yClicks',
-                    fill: false,
-                    tension: 0.1
-                }},
-                {{
-                    label: 'Impressions',
-                    data: data.map(row => row.impressions),
-                    borderColor: 'rgba(255, 99, 132, 1)',
-                    backgroundColor: 'rgba(255, 99, 132, 0.2)',
-                    yAxisID: 'yImpressions',
-                    fill: false,
-                    tension: 0.1
-                }}
-            ]
-        }},
-        options: {{
-            responsive: true,
-            maintainAspectRatio: false,
-            interaction: {{ mode: 'index', intersect: false }},
-            scales: {{
-                yClicks: {{ type: 'linear', display: true, position: 'left', title: {{ display: true, text: 'Clicks' }} }},
-                yImpressions: {{ type: 'linear', display: true, position: 'right', title: {{ display: true, text: 'Impressions' }}, grid: {{ drawOnChartArea: false }} }}
-            }}
-        }}
-    }});
-</script>
-</body></html>"""
+    template = get_template('key-performance-metrics-template.html')
+    return template.render(
+        report_title=report_title,
+        full_period_str=full_period_str,
+        report_body=report_body,
+        chart_data=chart_data
+    )
 
 def run_report(service, site_url, months=16, anchor_end_date=None):
     """Executes the Key Performance Metrics report."""
@@ -106,8 +58,8 @@ def run_report(service, site_url, months=16, anchor_end_date=None):
         return None
 
     # 3. Process to Monthly
-    df['date'] = pd.to_datetime(df['date'])
-    df['month'] = df['date'].dt.strftime('%Y-%m')
+    df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
+    df['month'] = df['date'].values.astype('datetime64[M]')
     
     monthly_df = df.groupby('month').agg({
         'clicks': 'sum',
@@ -119,7 +71,8 @@ def run_report(service, site_url, months=16, anchor_end_date=None):
     monthly_df = monthly_df.sort_values('month', ascending=False)
     
     # Keep date object for sorting in chart
-    monthly_df['month_date'] = pd.to_datetime(monthly_df['month'])
+    monthly_df['month_date'] = monthly_df['month']
+    monthly_df['month'] = monthly_df['month'].dt.strftime('%Y-%m')
 
     # 4. Output Paths
     output_dir = get_output_dir(site_url)
@@ -26,7 +26,7 @@ def get_latest_available_gsc_date(service, site_url, max_retries=10):
                 'dimensions': ['date'],
                 'rowLimit': 1
             }
-            response = service.searchanalytics().query(siteUrl=site_url, body=request).execute()
+            response = service.searchanalytics().query(siteUrl=site_url, body=request, fields='rows/keys').execute()
             if 'rows' in response and response['rows']:
                 return check_date
         except HttpError:
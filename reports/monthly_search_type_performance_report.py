@@ -264,7 +264,7 @@ def run_report(service, site_url, start_date, end_date):
         # Here we want a monthly breakdown, so we need 'date' in dimensions to group by month later.
         df_st = fetch_with_cache(service, site_url, start_date, end_date, ['date'], st)
         if not df_st.empty:
-            df_st['month'] = pd.to_datetime(df_st['date']).dt.strftime('%Y-%m')
+            df_st['month'] = pd.to_datetime(df_st['date'], format='%Y-%m-%d').dt.strftime('%Y-%m')
             # Aggregate by month
             monthly_df = df_st.groupby('month').agg({
                 'clicks': 'sum',
@@ -6,13 +6,16 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
 from urllib.parse import urlparse
 from core.naming import get_output_dir, get_filename_slug
-from core.cache import fetch_with_cache
+from core.cache import fetch_with_cache, set_cache_reads, prefetch_with_batch, count_unique
+from core.client import get_thread_service
+from core.tables import render_html_table, format_columns
 from core.date_utils import parse_standard_date_args
-from jinja2 import Environment, FileSystemLoader
+from core.templates import get_template
 
 def get_sort_key(site_url):
     """Creates a sort key for a site URL."""
@@ -45,14 +48,7 @@ def create_summary_report_html(df, report_title, date_range_str, site_url=None):
     report_df = report_df.sort_values(by=['sort_key', 'clicks'], ascending=[True, False]).drop(columns=['sort_key'])
 
     # Format numbers
-    report_df['clicks'] = report_df['clicks'].apply(lambda x: f"{x:,.0f}")
-    report_df['impressions'] = report_df['impressions'].apply(lambda x: f"{x:,.0f}")
-    report_df['ctr'] = report_df['ctr'].apply(lambda x: f"{x:.2%}")
-    report_df['position'] = report_df['position'].apply(lambda x: f"{x:,.2f}")
-    if 'queries' in report_df.columns:
-        report_df['queries'] = report_df['queries'].apply(lambda x: f"{x:,.0f}")
-    if 'pages' in report_df.columns:
-        report_df['pages'] = report_df['pages'].apply(lambda x: f"{x:,.0f}")
+    report_df = format_columns(report_df)
 
     report_df = report_df.rename(columns={
         'site_url': 'Property',
@@ -69,11 +65,9 @@ def create_summary_report_html(df, report_title, date_range_str, site_url=None):
     if '# Pages' in report_df.columns: cols.append('# Pages')
     report_df = report_df[cols]
 
-    table_html = report_df.to_html(classes="table table-striped table-hover", index=False, border=0)
+    table_html = render_html_table(report_df)
 
-    template_loader = FileSystemLoader('resources')
-    env = Environment(loader=template_loader)
-    template = env.get_template('report-blank.html')
+    template = get_template('report-blank.html', 'resources')
 
     html_output = template.render(
         title=report_title,
@@ -85,28 +79,65 @@ def create_summary_report_html(df, report_title, date_range_str, site_url=None):
 
     return html_output
 
-def run_report(service, sites, start_date, end_date, report_label=None):
+def has_activity(df_totals):
+    """Returns True if a totals frame records any clicks or impressions."""
+    if df_totals.empty:
+        return False
+    totals = df_totals.iloc[0]
+    return bool(totals.get('clicks', 0) or totals.get('impressions', 0))
+
+def summarise_site(service, site_url, start_date, end_date, df_totals=None):
+    """Fetches the totals (unless already supplied) and unique query/page counts for a single site."""
+    print(f"  - Processing {site_url}...")
+    service = get_thread_service(service)
+    # Get overall totals
+    if df_totals is None:
+        df_totals = fetch_with_cache(service, site_url, start_date, end_date, [])
+    if df_totals.empty:
+        return None
+    row = df_totals.iloc[0].to_dict()
+    # Get unique query and page counts; a site with no activity has none to count
+    if has_activity(df_totals):
+        row['queries'] = count_unique(service, site_url, start_date, end_date, 'query')
+        row['pages'] = count_unique(service, site_url, start_date, end_date, 'page')
+    else:
+        row['queries'] = 0
+        row['pages'] = 0
+    row['site_url'] = site_url
+    row['month'] = start_date[:7] # Add month column for historical report
+    return row
+
+def run_report(service, sites, start_date, end_date, report_label=None, workers=8):
     """Executes the monthly summary report for a list of sites."""
     if isinstance(sites, str):
         sites = [sites]
 
     print(f"Running Monthly Summary Report for {len(sites)} sites ({start_date} to {end_date})...")
 
-    all_data = []
-    for site_url in sites:
-        print(f"  - Processing {site_url}...")
-        # Get overall totals
-        df_totals = fetch_with_cache(service, site_url, start_date, end_date, [])
-        if not df_totals.empty:
-            row = df_totals.iloc[0].to_dict()
-            # Get unique query and page counts
-            df_queries = fetch_with_cache(service, site_url, start_date, end_date, ['query'])
-            df_pages = fetch_with_cache(service, site_url, start_date, end_date, ['page'])
-            row['queries'] = len(df_queries)
-            row['pages'] = len(df_pages)
-            row['site_url'] = site_url
-            row['month'] = start_date[:7] # Add month column for historical report
-            all_data.append(row)
+    # Prime the totals for every site in a few batched calls
+    denied = prefetch_with_batch(service, [(site_url, start_date, end_date, [], 'web') for site_url in sites])
+    if denied:
+        print(f"  - Skipping {len(denied)} site(s) without access: {', '.join(sorted(denied))}")
+        sites = [site_url for site_url in sites if site_url not in denied]
+
+    # Each site is independent network-bound work, so fetch several at once.
+    # map() keeps the results in the same order as the input sites.
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sites)))) as executor:
+        totals = list(executor.map(
+            lambda site: fetch_with_cache(get_thread_service(service), site, start_date, end_date, []), sites
+        ))
+
+        # Prime queries and pages only for sites whose totals show any activity
+        prefetch_with_batch(service, [
+            (site_url, start_date, end_date, dimensions, 'web')
+            for site_url, df_totals in zip(sites, totals) if has_activity(df_totals)
+            for dimensions in (['query'], ['page'])
+        ])
+
+        results = executor.map(
+            lambda item: summarise_site(service, item[0], start_date, end_date, item[1]), zip(sites, totals)
+        )
+        all_data = [row for row in results if row is not None]
 
     if not all_data:
         print("No data found for the given sites and period.")
@@ -154,8 +185,12 @@ if __name__ == '__main__':
     parser.add_argument('--end-date', help='End date (YYYY-MM-DD).')
     parser.add_argument('--last-7-days', action='store_true', help='Run for the last 7 available days.')
     parser.add_argument('--last-month', action='store_true', help='Run for the last calendar month.')
+    parser.add_argument('--workers', type=int, default=8, help='Number of sites to fetch concurrently (default 8).')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore cached data and re-fetch from the GSC API.')
 
     args = parser.parse_args()
+    if args.no_cache:
+        set_cache_reads(False)
     
 
     sites = []
@@ -169,4 +204,4 @@ if __name__ == '__main__':
     if service:
         start_date, end_date = parse_standard_date_args(args, service, args.site_url)
     if service and sites:
-        run_report(service, sites, start_date, end_date)
\ No newline at end of file
+        run_report(service, sites, start_date, end_date, workers=args.workers)
\ No newline at end of file
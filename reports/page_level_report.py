@@ -69,7 +69,8 @@ def create_html_report(df, report_title, period_str, summary_data, limit=None, t
   </div>
 """
 
-    table_body = ""
+    # Collect the rows and join once; repeated += copies the growing string for every page
+    body_rows = []
     for i, row in df_html.reset_index(drop=True).iterrows():
         bg_class = "bg-light" if i % 2 == 0 else ""
         row_cols_html = []
@@ -92,16 +93,15 @@ def create_html_report(df, report_title, period_str, summary_data, limit=None, t
                 f'<div class="col-2 text-end">{row.get("Query #", "0")}</div>'
             ])
 
-        table_body += f"""
+        body_rows.append(f"""
   <div class="row py-2 border-bottom {bg_class}">
     {''.join(row_cols_html)}
   </div>
-"""
+""")
+    table_body = ''.join(body_rows)
 
-    summary_html = "<h2 class='mt-5'>Overall Summary</h2><table class='table table-bordered' style='max-width: 500px;'>"
-    for key, value in summary_data.items():
-        summary_html += f"<tr><th style='width: 50%;'>{key}</th><td>{value}</td></tr>"
-    summary_html += "</table>"
+    summary_rows = ''.join(f"<tr><th style='width: 50%;'>{key}</th><td>{value}</td></tr>" for key, value in summary_data.items())
+    summary_html = f"<h2 class='mt-5'>Overall Summary</h2><table class='table table-bordered' style='max-width: 500px;'>{summary_rows}</table>"
     
     return f"""
 <!DOCTYPE html>
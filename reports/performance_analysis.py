@@ -26,7 +26,7 @@ from core.cache import fetch_with_cache
 from core.client import get_gsc_service
 from core.date_utils import parse_standard_date_args
 
-from jinja2 import Environment, FileSystemLoader
+from core.templates import get_template
 
 def create_html_report(page_title, current_period_str, previous_period_str, df_best, df_worst, df_low_ctr, df_rising_stars, df_falling_stars):
     """Generates an HTML report using a Jinja2 template."""
@@ -54,9 +54,7 @@ def create_html_report(page_title, current_period_str, previous_period_str, df_b
 
         return df.to_html(classes="table table-striped table-hover", index=False, table_id=table_id, border=0)
 
-    template_loader = FileSystemLoader('templates')
-    env = Environment(loader=template_loader)
-    template = env.get_template('performance-analysis-template.html')
+    template = get_template('performance-analysis-template.html')
 
     html_content = template.render(
         page_title=page_title,
@@ -16,7 +16,7 @@ from core.naming import get_output_dir, get_filename_slug
 from core.cache import fetch_with_cache
 from core.client import get_gsc_service
 from core.date_utils import parse_standard_date_args
-from jinja2 import Environment, FileSystemLoader
+from core.templates import get_template
 
 def apply_delta_formatting(val, is_pct=False):
     if pd.isna(val) or val == 0:
@@ -77,9 +77,7 @@ def create_html_report(page_title, current_period_str, previous_period_str, char
 
         return df.to_html(classes="table table-striped table-hover", index=False, escape=False, border=0)
 
-    template_loader = FileSystemLoader('templates')
-    env = Environment(loader=template_loader)
-    template = env.get_template('period-comparison-template.html')
+    template = get_template('period-comparison-template.html')
 
     html_content = template.render(
         page_title=page_title,
@@ -112,8 +110,8 @@ def run_report(service, site_url, start_date, end_date):
     
     chart_data = []
     if not df_date_cur.empty and not df_date_prev.empty:
-        df_date_cur['date'] = pd.to_datetime(df_date_cur['date'])
-        df_date_prev['date'] = pd.to_datetime(df_date_prev['date'])
+        df_date_cur['date'] = pd.to_datetime(df_date_cur['date'], format='%Y-%m-%d')
+        df_date_prev['date'] = pd.to_datetime(df_date_prev['date'], format='%Y-%m-%d')
         
         df_date_cur = df_date_cur.sort_values('date').reset_index(drop=True)
         df_date_prev = df_date_prev.sort_values('date').reset_index(drop=True)
@@ -2,7 +2,6 @@ import os
 import sys
 import pandas as pd
 from datetime import datetime, date, timedelta
-from dateutil.relativedelta import relativedelta
 import argparse
 
 # Add parent directory to sys.path to allow importing core
@@ -10,20 +9,17 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.naming import get_output_dir, get_filename_slug
 from core.cache import fetch_with_cache
+from core.tables import format_columns, METRIC_FORMATS
 from core.client import get_gsc_service
 from core.date_utils import parse_standard_date_args
 
 def create_html_report(df, report_title, period_str):
     """Generates an HTML report from the DataFrame."""
-    df_html = df.copy()
-
     # Format numeric columns
-    df_html['clicks'] = pd.to_numeric(df_html['clicks'], errors='coerce').fillna(0).apply(lambda x: f"{x:,.0f}")
-    df_html['impressions'] = pd.to_numeric(df_html['impressions'], errors='coerce').fillna(0).apply(lambda x: f"{x:,.0f}")
-    df_html['queries'] = pd.to_numeric(df_html['queries'], errors='coerce').fillna(0).apply(lambda x: f"{x:,.0f}")
-    df_html['pages'] = pd.to_numeric(df_html['pages'], errors='coerce').fillna(0).apply(lambda x: f"{x:,.0f}")
-    df_html['ctr'] = pd.to_numeric(df_html['ctr'], errors='coerce').fillna(0).apply(lambda x: f"{x:.2%}")
-    df_html['position'] = pd.to_numeric(df_html['position'], errors='coerce').fillna(0).apply(lambda x: f"{x:.2f}")
+    metrics = list(METRIC_FORMATS)
+    df_html = df.copy()
+    df_html[metrics] = df_html[metrics].apply(pd.to_numeric, errors='coerce').fillna(0)
+    df_html = format_columns(df_html)
 
     table_html = df_html.to_html(classes="table table-striped table-hover", index=False, border=0)
 
@@ -57,6 +53,21 @@ def create_html_report(df, report_title, period_str):
 </html>
 """
 
+def summarise_period(df, period):
+    """Collapses a query/page DataFrame into a single row of totals for the period."""
+    clicks = df['clicks'].sum()
+    impressions = df['impressions'].sum()
+    unique_counts = df[['query', 'page']].nunique()
+    return {
+        'period': period,
+        'clicks': clicks,
+        'impressions': impressions,
+        'queries': unique_counts['query'],
+        'pages': unique_counts['page'],
+        'ctr': clicks / impressions if impressions > 0 else 0,
+        'position': df['position'].mean()
+    }
+
 def run_report(service, site_url, start_date=None, end_date=None, months=None):
     """
     Runs the queries and pages analysis report.
@@ -69,16 +80,7 @@ def run_report(service, site_url, start_date=None, end_date=None, months=None):
             print(f"No data found for {site_url}")
             return
 
-        summary_data = {
-            'period': f"{start_date} to {end_date}",
-            'clicks': df['clicks'].sum(),
-            'impressions': df['impressions'].sum(),
-            'queries': df['query'].nunique(),
-            'pages': df['page'].nunique(),
-            'ctr': df['clicks'].sum() / df['impressions'].sum() if df['impressions'].sum() > 0 else 0,
-            'position': df['position'].mean()
-        }
-        df_final = pd.DataFrame([summary_data])
+        df_final = pd.DataFrame([summarise_period(df, f"{start_date} to {end_date}")])
         display_range = f"{start_date} to {end_date}"
     else:
         # Historical monthly mode
@@ -86,35 +88,19 @@ def run_report(service, site_url, start_date=None, end_date=None, months=None):
         print(f"Running monthly queries/pages analysis for {site_url} ({months} months ending {end_date})")
         
         all_monthly_data = []
-        base_end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+        # Precompute the month ranges, most recent first
+        periods = pd.period_range(end=end_date, periods=months, freq='M')[::-1]
+        ranges = [(p.start_time.strftime('%Y-%m-%d'), p.end_time.strftime('%Y-%m-%d'), p.strftime('%Y-%m')) for p in periods]
+        # Respect the exact end_date for the target month
+        ranges[0] = (ranges[0][0], end_date, ranges[0][2])
 
-        # Fetch data for each of the last N months
-        first_of_end_month = base_end_dt.replace(day=1)
-        for i in range(months):
-            month_dt = first_of_end_month - relativedelta(months=i)
-            m_start = month_dt.strftime('%Y-%m-01')
-            
-            import calendar
-            last_day = calendar.monthrange(month_dt.year, month_dt.month)[1]
-            m_end = f"{month_dt.year:04d}-{month_dt.month:02d}-{last_day:02d}"
-            if i == 0:
-                m_end = end_date # Respect exact end_date for the target month
-            
-            print(f"  - Fetching data for {month_dt.strftime('%Y-%m')}...")
+        for m_start, m_end, month_label in ranges:
+            print(f"  - Fetching data for {month_label}...")
             
             df = fetch_with_cache(service, site_url, m_start, m_end, dimensions=['query', 'page'])
             
             if not df.empty:
-                monthly_totals = {
-                    'period': month_dt.strftime('%Y-%m'),
-                    'clicks': df['clicks'].sum(),
-                    'impressions': df['impressions'].sum(),
-                    'queries': df['query'].nunique(),
-                    'pages': df['page'].nunique(),
-                    'ctr': df['clicks'].sum() / df['impressions'].sum() if df['impressions'].sum() > 0 else 0,
-                    'position': df['position'].mean()
-                }
-                all_monthly_data.append(monthly_totals)
+                all_monthly_data.append(summarise_period(df, month_label))
         
         if not all_monthly_data:
             print(f"No data found for {site_url}")
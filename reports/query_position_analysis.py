@@ -19,10 +19,12 @@ def create_html_report(df, report_title, period_str):
     # Format for table
     for col in df_table.columns:
         if ('clicks' in col or 'impressions' in col) and col != 'month':
-            df_table[col] = df_table[col].apply(lambda x: f"{x:,.0f}")
+            df_table[col] = df_table[col].map('{:,.0f}'.format)
     
     report_body = df_table.to_html(classes="table table-striped table-hover", index=False, border=0)
-    chart_data = df.sort_values(by='month').to_json(orient='records')
+    # Only the columns the chart reads are embedded in the page
+    chart_columns = [c for c in df.columns if c == 'month' or c.startswith(('clicks_', 'impressions_', 'total_'))]
+    chart_data = df.sort_values(by='month')[chart_columns].to_json(orient='records')
 
     return f"""
 <!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">
@@ -7,12 +7,12 @@ import sys
 import argparse
 import pandas as pd
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
 
 # Add parent directory to sys.path to allow importing core
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.naming import get_output_dir, get_filename_slug
+from core.templates import get_template
 from core.cache import fetch_with_cache
 from core.client import get_gsc_service, get_available_properties
 from core.date_utils import parse_standard_date_args
@@ -111,9 +111,7 @@ def create_html_report(df, report_title, date_range_str, site_url=None):
     </div>
     """
 
-    template_loader = FileSystemLoader('resources')
-    env = Environment(loader=template_loader)
-    template = env.get_template('report-blank.html')
+    template = get_template('report-blank.html', 'resources')
 
     html_output = template.render(
         title=report_title,
@@ -17,25 +17,21 @@ def generate_xml_sitemap(urls):
     xml_header = '<?xml version="1.0" encoding="UTF-8"?>\n'
     xml_header += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
     
-    xml_body = ""
-    for url in urls:
-        xml_body += f"  <url>\n    <loc>{url}</loc>\n  </url>\n"
+    xml_body = ''.join(f"  <url>\n    <loc>{url}</loc>\n  </url>\n" for url in urls)
         
     xml_footer = '</urlset>'
     return xml_header + xml_body + xml_footer
 
 def create_html_summary(site_url, start_date, end_date, monthly_stats, total_pages):
     """Generates an HTML summary report of the sitemap generation."""
-    rows_html = ""
-    for stat in monthly_stats:
-        rows_html += f"""
+    rows_html = ''.join(f"""
         <tr>
             <td>{stat['month']}</td>
             <td class="text-end">{stat['pages']:,}</td>
             <td class="text-end">{stat['clicks']:,}</td>
             <td class="text-end">{stat['impressions']:,}</td>
         </tr>
-        """
+        """ for stat in monthly_stats)
 
     return f"""
 <!DOCTYPE html>
@@ -15,7 +15,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.naming import get_output_dir, get_filename_slug
 from core.date_utils import parse_standard_date_args
-from core.client import get_gsc_service, get_available_properties
+from core.client import get_gsc_service, get_available_properties, execute_with_retry
 
 def find_best_property(inspect_url, available_properties):
     """
@@ -78,7 +78,7 @@ def get_url_inspection_data(service, site_url, inspect_url):
             'siteUrl': site_url,
             'languageCode': 'en-US'
         }
-        response = service.urlInspection().index().inspect(body=request).execute()
+        response = execute_with_retry(service.urlInspection().index().inspect(body=request))
         return response.get('inspectionResult')
     except Exception as e:
         return {"error": str(e)}
@@ -14,13 +14,44 @@ Usage:
 
     # Pass additional arguments to the target script
     python run_for_sites.py reports/snapshot_report.py --sites-file site-lists/sites.txt --last-7-days
+
+Scripts run in this interpreter by default, so start-up and authentication happen
+once for the whole list. Use --subprocess to run each site in a separate process.
 """
 
 import os
 import sys
+import runpy
 import subprocess
 import argparse
 
+def run_in_process(script_to_run, site, other_args):
+    """Runs the script as __main__ in this interpreter and returns its exit code."""
+    saved_argv = sys.argv
+    sys.argv = [script_to_run, site] + other_args
+    try:
+        runpy.run_path(script_to_run, run_name='__main__')
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code)
+        return 1
+    finally:
+        sys.argv = saved_argv
+
+def run_in_subprocess(script_to_run, site, other_args):
+    """Runs the script in a separate Python process and returns its exit code."""
+    command = ['python', script_to_run, site] + other_args
+    print(f"Executing command: {' '.join(command)}")
+    process = subprocess.run(
+        command, 
+        capture_output=False, 
+        text=True, 
+        check=False
+    )
+    return process.returncode
+
 def main():
     """
     Parses arguments and runs the specified script for each site.
@@ -34,6 +65,7 @@ def main():
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('sites', nargs='*', default=[], help='A list of site URLs to process.')
     group.add_argument('--sites-file', help='Path to a text file containing a list of site URLs, one per line.')
+    parser.add_argument('--subprocess', action='store_true', help='Run each site in a separate Python process instead of in-process.')
     
     # Capture any unknown arguments to pass them to the target script
     args, other_args = parser.parse_known_args()
@@ -64,24 +96,16 @@ def main():
     for site in sites_to_process:
         print(f"\n{'='*20} Running for: {site} {'='*20}")
         
-        # Construct the command for the subprocess
-        command = ['python', script_to_run, site] + other_args
-        
-        print(f"Executing command: {' '.join(command)}")
-        
         try:
-            # Use subprocess.run
-            process = subprocess.run(
-                command, 
-                capture_output=False, 
-                text=True, 
-                check=False
-            )
+            if args.subprocess:
+                returncode = run_in_subprocess(script_to_run, site, other_args)
+            else:
+                returncode = run_in_process(script_to_run, site, other_args)
             
-            if process.returncode == 0:
+            if returncode == 0:
                 print(f"\n----- Successfully completed for {site} -----")
             else:
-                print(f"\n----- Script finished with a non-zero exit code ({process.returncode}) for {site} -----")
+                print(f"\n----- Script finished with a non-zero exit code ({returncode}) for {site} -----")
 
         except Exception as e:
             print(f"\nAn unexpected error occurred while running the script for {site}: {e}")
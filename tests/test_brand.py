@@ -0,0 +1,14 @@
+import pandas as pd
+from core.brand import classify_query, classify_queries
+
+def test_classify_queries_matches_classify_query():
+    brand_terms = {'acme', 'acme co'}
+    queries = pd.Series(['Acme login', 'acmeist shoes', 'best acme co deals', 'running shoes'])
+    result = classify_queries(queries, brand_terms)
+    assert result.tolist() == [classify_query(q, brand_terms) for q in queries]
+    assert result.tolist() == [True, False, True, False]
+
+def test_classify_queries_without_brand_terms():
+    queries = pd.Series(['acme', None])
+    assert classify_queries(queries, set()).tolist() == [False, False]
+    assert classify_queries(queries, {'acme'}).tolist() == [True, False]
@@ -1,6 +1,6 @@
 import pytest
 import pandas as pd
-from datetime import date
+from datetime import date, timedelta
 from core.cache import _get_monthly_chunks, fetch_with_cache
 
 def test_get_monthly_chunks_single_month():
@@ -132,3 +132,260 @@ def test_fetch_from_api_timeout_retry(mocker, capsys):
     captured = capsys.readouterr()
     assert "Timeout occurred. Retrying (attempt 1/3)..." in captured.out
     assert "Retrieved 1 rows (total: 1) in " in captured.out
+
+def test_fetch_from_api_rate_limit_retry(mocker, capsys):
+    from googleapiclient.errors import HttpError
+    from core.cache import _fetch_from_api
+
+    mocker.patch('time.sleep')
+
+    mock_service = mocker.MagicMock()
+    mock_execute = mock_service.searchanalytics.return_value.query.return_value
+
+    rate_limited = HttpError(mocker.MagicMock(status=429), b'Quota exceeded')
+    mock_execute.execute.side_effect = [
+        rate_limited,
+        {'rows': [{'keys': ['page1'], 'clicks': 1, 'impressions': 10, 'ctr': 0.1, 'position': 1.0}]}
+    ]
+
+    df = _fetch_from_api(mock_service, 'sc-domain:example.com', '2026-05-01', '2026-05-31', ['page'], row_limit=10)
+
+    assert len(df) == 1
+    captured = capsys.readouterr()
+    assert "Rate limited. Retrying in" in captured.out
+
+def test_prefetch_with_batch_writes_fragments(mocker, tmp_path):
+    from core import cache
+
+    mocker.patch('core.cache.CACHE_DIR', str(tmp_path))
+
+    added = []
+
+    class FakeBatch:
+        def __init__(self):
+            self.callbacks = []
+
+        def add(self, request, callback=None, request_id=None):
+            self.callbacks.append(callback)
+            added.append(callback)
+
+        def execute(self):
+            for callback in self.callbacks:
+                callback(None, {'rows': [{'clicks': 5, 'impressions': 50, 'ctr': 0.1, 'position': 3.0}]}, None)
+
+    mock_service = mocker.MagicMock()
+    mock_service.new_batch_http_request.side_effect = FakeBatch
+    mock_acquire = mocker.patch('core.cache.rate_limiter.acquire')
+
+    requests = [
+        ('sc-domain:example.com', '2024-01-01', '2024-02-29', [], 'web'),
+        ('https://www.example.com/', '2024-01-01', '2024-01-31', [], 'web'),
+    ]
+    cache.prefetch_with_batch(mock_service, requests, batch_size=2)
+
+    # Three monthly fragments split across two batches
+    assert mock_service.new_batch_http_request.call_count == 2
+    assert len(added) == 3
+    # One rate-limiter token per sub-request
+    assert [call.args for call in mock_acquire.call_args_list] == [(2,), (1,)]
+
+    # Subsequent reads are served from the cache without touching the API
+    mock_service.searchanalytics.reset_mock()
+    result = cache.fetch_with_cache(mock_service, 'sc-domain:example.com', '2024-01-01', '2024-02-29', [])
+    assert result.iloc[0]['clicks'] == 10
+    mock_service.searchanalytics.return_value.query.return_value.execute.assert_not_called()
+
+def test_fetch_with_cache_coalesces_daily_requests(mocker, tmp_path):
+    from core import cache
+
+    mocker.patch('core.cache.CACHE_DIR', str(tmp_path))
+
+    mock_service = mocker.MagicMock()
+    mock_query = mock_service.searchanalytics.return_value.query
+    mock_query.return_value.execute.return_value = {'rows': [
+        {'keys': ['2024-01-15'], 'clicks': 1, 'impressions': 10, 'ctr': 0.1, 'position': 1.0},
+        {'keys': ['2024-02-15'], 'clicks': 2, 'impressions': 20, 'ctr': 0.1, 'position': 2.0},
+        {'keys': ['2024-03-15'], 'clicks': 3, 'impressions': 30, 'ctr': 0.1, 'position': 3.0},
+    ]}
+
+    result = cache.fetch_with_cache(mock_service, 'sc-domain:example.com', '2024-01-01', '2024-03-31', ['date'])
+
+    # One ranged request instead of one per month
+    assert mock_query.call_count == 1
+    assert mock_query.call_args.kwargs['body']['startDate'] == '2024-01-01'
+    assert mock_query.call_args.kwargs['body']['endDate'] == '2024-03-31'
+    assert mock_query.call_args.kwargs['fields'] == cache.ROW_FIELDS
+    assert len(result) == 3
+
+    # Each month is still cached as its own fragment
+    fragments = list((tmp_path / 'sc-domain.example.com').glob('*.csv'))
+    assert len(fragments) == 3
+    february = cache.fetch_with_cache(mock_service, 'sc-domain:example.com', '2024-02-01', '2024-02-29', ['date'])
+    assert february['clicks'].tolist() == [2]
+    assert mock_query.call_count == 1
+
+def test_fetch_with_cache_no_cache_and_incomplete_periods(tmp_path, mocker):
+    from core import cache
+    mocker.patch.object(cache, 'CACHE_DIR', str(tmp_path))
+    mock_service = mocker.Mock()
+    mock_service.searchanalytics().query().execute.return_value = {
+        'rows': [{'keys': [], 'clicks': 5, 'impressions': 50, 'ctr': 0.1, 'position': 2.0}]
+    }
+    mock_query = mock_service.searchanalytics().query
+    mock_query.reset_mock()
+
+    cache.fetch_with_cache(mock_service, 'sc-domain:example.com', '2024-01-01', '2024-01-31', [])
+    cache.fetch_with_cache(mock_service, 'sc-domain:example.com', '2024-01-01', '2024-01-31', [])
+    assert mock_query.call_count == 1
+
+    # A later --no-cache run ignores the fragment
+    mocker.patch.object(cache, '_fetched_this_run', set())
+    mocker.patch.object(cache, 'READ_CACHE', False)
+    cache.fetch_with_cache(mock_service, 'sc-domain:example.com', '2024-01-01', '2024-01-31', [])
+    assert mock_query.call_count == 2
+
+    # A period ending today is never written to the cache
+    today = date.today().strftime('%Y-%m-%d')
+    mocker.patch.object(cache, 'READ_CACHE', True)
+    cache.fetch_with_cache(mock_service, 'sc-domain:example.com', today, today, [])
+    cache.fetch_with_cache(mock_service, 'sc-domain:example.com', today, today, [])
+    assert mock_query.call_count == 4
+
+def test_fetch_from_api_streams_pages_to_csv(mocker, tmp_path):
+    from core.cache import _fetch_from_api
+
+    mock_service = mocker.MagicMock()
+    mock_execute = mock_service.searchanalytics.return_value.query.return_value
+    mock_execute.execute.side_effect = [
+        {'rows': [{'keys': [f'/page{i}'], 'clicks': i, 'impressions': 10, 'ctr': 0.1, 'position': 1.0} for i in range(2)]},
+        {'rows': [{'keys': ['/page2'], 'clicks': 2, 'impressions': 10, 'ctr': 0.2, 'position': 2.0}]}
+    ]
+    csv_path = tmp_path / 'site' / 'fragment.csv'
+
+    df = _fetch_from_api(mock_service, 'sc-domain:example.com', '2024-01-01', '2024-01-31', ['page'], row_limit=2, csv_path=str(csv_path))
+
+    assert csv_path.exists()
+    assert not (tmp_path / 'site' / 'fragment.csv.tmp').exists()
+    assert list(df.columns) == ['clicks', 'impressions', 'ctr', 'position', 'page']
+    assert df['page'].tolist() == ['/page0', '/page1', '/page2']
+
+def test_fetch_with_cache_totals_without_keys(mocker, tmp_path):
+    from core import cache
+
+    mocker.patch('core.cache.CACHE_DIR', str(tmp_path))
+    mock_service = mocker.MagicMock()
+    # The API omits 'keys' when no dimensions are requested
+    mock_service.searchanalytics.return_value.query.return_value.execute.return_value = {
+        'rows': [{'clicks': 5, 'impressions': 50, 'ctr': 0.1, 'position': 3.0}]
+    }
+
+    df = cache.fetch_with_cache(mock_service, 'sc-domain:example.com', '2024-01-01', '2024-01-31', [])
+
+    assert df.iloc[0]['clicks'] == 5
+    assert len(list((tmp_path / 'sc-domain.example.com').glob('*.csv'))) == 1
+
+def test_prefetch_with_batch_skips_denied_sites(mocker, tmp_path):
+    from googleapiclient.errors import HttpError
+    from core import cache
+
+    mocker.patch('core.cache.CACHE_DIR', str(tmp_path))
+
+    added = []
+
+    class FakeBatch:
+        def __init__(self):
+            self.callbacks = []
+
+        def add(self, request, callback=None, request_id=None):
+            self.callbacks.append(callback)
+            added.append(callback)
+
+        def execute(self):
+            for callback in self.callbacks:
+                callback(None, None, HttpError(mocker.Mock(status=403), b'Forbidden'))
+
+    mock_service = mocker.MagicMock()
+    mock_service.new_batch_http_request.side_effect = FakeBatch
+
+    # Three monthly fragments for one site, one per batch
+    requests = [('sc-domain:example.com', '2024-01-01', '2024-03-31', [], 'web')]
+    denied = cache.prefetch_with_batch(mock_service, requests, batch_size=1)
+
+    assert denied == {'sc-domain:example.com'}
+    assert len(added) == 1
+
+def test_count_unique_across_cached_months(mocker, tmp_path):
+    from core import cache
+
+    mocker.patch('core.cache.CACHE_DIR', str(tmp_path))
+    mock_service = mocker.MagicMock()
+    mock_service.searchanalytics.return_value.query.return_value.execute.side_effect = [
+        {'rows': [{'keys': ['shoes'], 'clicks': 1, 'impressions': 10, 'ctr': 0.1, 'position': 1.0},
+                  {'keys': ['123'], 'clicks': 1, 'impressions': 10, 'ctr': 0.1, 'position': 1.0}]},
+        {'rows': [{'keys': ['shoes'], 'clicks': 2, 'impressions': 20, 'ctr': 0.1, 'position': 1.0},
+                  {'keys': ['boots'], 'clicks': 2, 'impressions': 20, 'ctr': 0.1, 'position': 1.0}]},
+    ]
+
+    assert cache.count_unique(mock_service, 'sc-domain:example.com', '2024-01-01', '2024-02-29', 'query') == 3
+    # The second count is served from the cached fragments
+    assert cache.count_unique(mock_service, 'sc-domain:example.com', '2024-01-01', '2024-02-29', 'query') == 3
+    assert mock_service.searchanalytics.return_value.query.return_value.execute.call_count == 2
+
+def test_fetch_with_cache_refetches_unsettled_fragments(mocker, tmp_path):
+    import json
+    from core import cache
+
+    mocker.patch('core.cache.CACHE_DIR', str(tmp_path))
+    mock_service = mocker.MagicMock()
+    mock_execute = mock_service.searchanalytics.return_value.query.return_value.execute
+    mock_execute.return_value = {'rows': [{'keys': [], 'clicks': 5, 'impressions': 50, 'ctr': 0.1, 'position': 2.0}]}
+
+    cache.fetch_with_cache(mock_service, 'sc-domain:example.com', '2024-01-01', '2024-01-31', [])
+    cache_key = cache._get_cache_key('sc-domain:example.com', '2024-01-01', '2024-01-31', [], 'web')
+    _, json_path = cache._get_cache_paths(cache_key, 'sc-domain:example.com')
+
+    # Fetched the day after the month ended: GSC may still revise it
+    with open(json_path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    metadata['fetched_at'] = '2024-02-01T09:00:00'
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+
+    # A later run refetches it
+    mocker.patch.object(cache, '_fetched_this_run', set())
+    cache.fetch_with_cache(mock_service, 'sc-domain:example.com', '2024-01-01', '2024-01-31', [])
+    assert mock_execute.call_count == 2
+
+    # The refetched fragment is settled and served from the cache
+    cache.fetch_with_cache(mock_service, 'sc-domain:example.com', '2024-01-01', '2024-01-31', [])
+    assert mock_execute.call_count == 2
+
+def test_prefetched_recent_fragment_is_reused_in_the_same_run(mocker, tmp_path):
+    from core import cache
+
+    mocker.patch('core.cache.CACHE_DIR', str(tmp_path))
+    mocker.patch('core.cache.READ_CACHE', False)
+    mocker.patch('core.cache.rate_limiter.acquire')
+
+    class FakeBatch:
+        def __init__(self):
+            self.callbacks = []
+
+        def add(self, request, callback=None, request_id=None):
+            self.callbacks.append(callback)
+
+        def execute(self):
+            for callback in self.callbacks:
+                callback(None, {'rows': [{'clicks': 5, 'impressions': 50, 'ctr': 0.1, 'position': 3.0}]}, None)
+
+    mock_service = mocker.MagicMock()
+    mock_service.new_batch_http_request.side_effect = FakeBatch
+
+    # Ended two days ago: not yet settled, and cache reads are disabled
+    recent = (date.today() - timedelta(days=2)).strftime('%Y-%m-%d')
+    cache.prefetch_with_batch(mock_service, [('sc-domain:example.com', recent, recent, [], 'web')])
+    result = cache.fetch_with_cache(mock_service, 'sc-domain:example.com', recent, recent, [])
+
+    assert result.iloc[0]['clicks'] == 5
+    assert mock_service.new_batch_http_request.call_count == 1
+    mock_service.searchanalytics.return_value.query.return_value.execute.assert_not_called()
@@ -0,0 +1,49 @@
+import pytest
+from googleapiclient.errors import HttpError
+from core.client import execute_with_retry
+
+def test_execute_with_retry_recovers_from_server_errors(mocker):
+    mocker.patch('time.sleep')
+    request = mocker.Mock()
+    request.execute.side_effect = [HttpError(mocker.Mock(status=503), b'Backend Error'), {'rows': []}]
+    assert execute_with_retry(request) == {'rows': []}
+    assert request.execute.call_count == 2
+
+def test_execute_with_retry_raises_other_errors(mocker):
+    mocker.patch('time.sleep')
+    request = mocker.Mock()
+    request.execute.side_effect = HttpError(mocker.Mock(status=403), b'Forbidden')
+    with pytest.raises(HttpError):
+        execute_with_retry(request)
+    assert request.execute.call_count == 1
+
+def test_rate_limiter_allows_burst_then_waits(mocker):
+    from core.client import RateLimiter
+
+    sleep = mocker.patch('time.sleep')
+    limiter = RateLimiter(rate=10, burst=2)
+    limiter.acquire()
+    limiter.acquire()
+    sleep.assert_not_called()
+    limiter.acquire()
+    assert sleep.call_args.args[0] == pytest.approx(0.1, abs=0.01)
+
+def test_get_thread_service_builds_one_service_per_thread(mocker):
+    import threading
+    from google.auth.credentials import AnonymousCredentials
+    from googleapiclient.discovery import build
+    from core import client
+
+    creds = AnonymousCredentials()
+    mocker.patch('core.client._credentials', creds)
+    service = build('searchconsole', 'v1', credentials=creds, static_discovery=True)
+
+    main_service = client.get_thread_service(service)
+    assert main_service is not service
+    assert client.get_thread_service(service) is main_service
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(client.get_thread_service(service)))
+    thread.start()
+    thread.join()
+    assert other[0] is not main_service
@@ -1,5 +1,5 @@
 import pytest
-from core.naming import get_property_name, get_output_dir, get_filename_slug
+from core.naming import get_property_name, get_output_dir, get_filename_slug, get_hostname, get_base_domain
 
 def test_get_property_name_domain():
     assert get_property_name('sc-domain:example.com') == 'sc-domain.example.com'
@@ -15,3 +15,14 @@ def test_get_output_dir():
 def test_get_filename_slug():
     assert get_filename_slug('https://www.example.com/') == 'www-example-com'
     assert get_filename_slug('sc-domain:example.com') == 'sc-domain-example-com'
+
+def test_get_hostname():
+    assert get_hostname('sc-domain:example.com') == 'example.com'
+    assert get_hostname('https://www.example.com/blog/') == 'www.example.com'
+    assert get_hostname('not a url') is None
+
+def test_get_base_domain():
+    assert get_base_domain('sc-domain:example.com') == 'example.com'
+    assert get_base_domain('https://blog.example.co.uk/') == 'example.co.uk'
+    assert get_base_domain('https://www.example.com/') == 'example.com'
+    assert get_base_domain('not a url') == 'not a url'
@@ -1,5 +1,7 @@
 import pytest
 import os
+import re
+import json
 import pandas as pd
 from datetime import datetime
 from unittest.mock import MagicMock
@@ -72,7 +74,15 @@ def test_query_position_analysis_report(mock_service, mocker):
     output_dir = get_output_dir(site)
     slug = get_filename_slug(site)
     assert os.path.exists(os.path.join(output_dir, f"query-position-analysis-{slug}-2026-05-01-to-2026-05-31.csv"))
-    assert os.path.exists(os.path.join(output_dir, f"query-position-analysis-{slug}-2026-05-01-to-2026-05-31.html"))
+    html_path = os.path.join(output_dir, f"query-position-analysis-{slug}-2026-05-01-to-2026-05-31.html")
+    assert os.path.exists(html_path)
+
+    # Every field the chart script reads is present in the embedded data
+    with open(html_path, encoding='utf-8') as f:
+        html_output = f.read()
+    chart_rows = json.loads(re.search(r'const data = (\[.*?\]);', html_output).group(1))
+    for field in set(re.findall(r'row\.(\w+)', html_output)):
+        assert field in chart_rows[0], field
 
 def test_url_inspection_report(mock_service, mocker):
     # Mock the response from urlInspection().index().inspect().execute()
@@ -157,3 +167,167 @@ def test_daily_performance_matrix_report(mock_service, mocker):
     assert os.path.exists(impressions_csv)
     assert os.path.exists(html_path)
 
+
+def test_monthly_summary_report_multiple_sites(mock_service, mocker):
+    def fake_fetch(service, site_url, start_date, end_date, dimensions, *args, **kwargs):
+        if not dimensions:
+            clicks = 10 if 'one' in site_url else 20
+            return pd.DataFrame([{'clicks': clicks, 'impressions': 100, 'ctr': clicks / 100, 'position': 1.5}])
+        return pd.DataFrame()
+
+    mocker.patch('reports.monthly_summary_report.fetch_with_cache', side_effect=fake_fetch)
+    mocker.patch('reports.monthly_summary_report.count_unique', return_value=3)
+    from reports.monthly_summary_report import run_report
+
+    sites = ['https://one.example.com/', 'https://two.example.com/']
+    html_path = run_report(mock_service, sites, '2024-01-01', '2024-01-31', workers=2)
+
+    csv_path = os.path.join('output', 'account', "monthly-summary-report-account-wide-2024-01-01-to-2024-01-31.csv")
+    assert os.path.exists(html_path)
+    df = pd.read_csv(csv_path)
+    # Results keep the input site order regardless of which worker finished first
+    assert df['site_url'].tolist() == sites
+    assert df['clicks'].tolist() == [10, 20]
+    assert df['queries'].tolist() == [3, 3]
+
+def test_monthly_summary_report_skips_counts_for_inactive_sites(mock_service, mocker):
+    def fake_fetch(service, site_url, start_date, end_date, dimensions, *args, **kwargs):
+        clicks = 0 if 'quiet' in site_url else 10
+        return pd.DataFrame([{'clicks': clicks, 'impressions': clicks * 10, 'ctr': 0.1, 'position': 1.5}])
+
+    mocker.patch('reports.monthly_summary_report.fetch_with_cache', side_effect=fake_fetch)
+    mock_count = mocker.patch('reports.monthly_summary_report.count_unique', return_value=3)
+    from reports.monthly_summary_report import run_report
+
+    sites = ['https://busy.example.com/', 'https://quiet.example.com/']
+    run_report(mock_service, sites, '2024-01-01', '2024-01-31', workers=2)
+
+    assert {call.args[1] for call in mock_count.call_args_list} == {'https://busy.example.com/'}
+    csv_path = os.path.join('output', 'account', "monthly-summary-report-account-wide-2024-01-01-to-2024-01-31.csv")
+    assert pd.read_csv(csv_path)['queries'].tolist() == [3, 0]
+
+def test_generate_gsc_wrapped_report(mock_service, mocker):
+    df_pages = pd.DataFrame({'page': ['https://example.com/p1'], 'clicks': [10], 'impressions': [100]})
+    df_queries = pd.DataFrame({'query': ['keyword1'], 'clicks': [10], 'impressions': [100]})
+    # No daily data: the busiest-month fields fall back to "N/A"
+    mocker.patch('reports.generate_gsc_wrapped.fetch_with_cache', side_effect=[df_pages, df_queries, pd.DataFrame()])
+    from reports.generate_gsc_wrapped import run_report
+
+    site = 'https://www.example.com/'
+    html_path = run_report(mock_service, site, '2024-01-01', '2024-12-31', brand_terms=set())
+    assert os.path.exists(html_path)
+
+def test_queries_pages_analysis_report(mock_service, mocker):
+    mocker.patch('reports.queries_pages_analysis.fetch_with_cache', return_value=pd.DataFrame(mock_df_data))
+    from reports.queries_pages_analysis import run_report
+
+    site = 'https://www.example.com/'
+    run_report(mock_service, site, '2024-01-01', '2024-01-31')
+
+    output_dir = get_output_dir(site)
+    slug = get_filename_slug(site)
+    df = pd.read_csv(os.path.join(output_dir, f"queries-pages-analysis-{slug}-2024-01-31.csv"))
+    assert df.iloc[0]['clicks'] == 30
+    assert df.iloc[0]['queries'] == 2
+    assert df.iloc[0]['pages'] == 2
+    assert os.path.exists(os.path.join(output_dir, f"queries-pages-analysis-{slug}-2024-01-31.html"))
+
+def test_gsc_pages_queries_report(mock_service, mocker):
+    mocker.patch('reports.gsc_pages_queries.fetch_with_cache', return_value=pd.DataFrame(mock_df_data))
+    from reports.gsc_pages_queries import run_report
+
+    site = 'https://www.example.com/'
+    html_path = run_report(mock_service, site, '2024-01-01', '2024-01-31', brand_terms=['keyword1'])
+
+    with open(html_path, encoding='utf-8') as f:
+        html = f.read()
+    assert 'keyword1' in html
+    assert 'https://example.com/p2' in html
+
+def test_generate_gsc_wrapped_summarise_months():
+    from reports.generate_gsc_wrapped import summarise_months
+
+    df_daily = pd.DataFrame({
+        'date': ['2024-12-30', '2024-12-31', '2025-02-01'],
+        'clicks': [10, 20, 5],
+        'impressions': [100, 200, 50],
+        'ctr': [0.1, 0.1, 0.1],
+        'position': [2.0, 4.0, 1.0]
+    })
+    monthly = summarise_months(df_daily)
+    assert [m.strftime('%Y-%m') for m in monthly.index] == ['2024-12', '2025-02']
+    assert monthly['clicks'].tolist() == [30, 5]
+    assert monthly['position'].tolist() == [3.0, 1.0]
+    assert monthly['clicks'].idxmax().strftime('%B') == 'December'
+
+def test_queries_pages_analysis_report_monthly(mock_service, mocker):
+    mock_fetch = mocker.patch('reports.queries_pages_analysis.fetch_with_cache', return_value=pd.DataFrame(mock_df_data))
+    from reports.queries_pages_analysis import run_report
+
+    run_report(mock_service, 'https://www.example.com/', end_date='2024-03-15', months=3)
+
+    ranges = [call.args[2:4] for call in mock_fetch.call_args_list]
+    assert ranges == [('2024-03-01', '2024-03-15'), ('2024-02-01', '2024-02-29'), ('2024-01-01', '2024-01-31')]
+
+def test_historical_summary_table():
+    from reports.historical_summary_report import create_historical_report
+
+    df = pd.DataFrame({
+        'month': ['2024-01'], 'clicks': [1234], 'impressions': [10000], 'ctr': [0.1234],
+        'position': [3.456], 'queries': [100], 'pages': [10]
+    })
+    html_output = create_historical_report(df, 'Historical Summary', 'https://www.example.com/')
+    assert '<tr><td>2024-01</td><td>1,234</td><td>10,000</td><td>12.34%</td><td>3.46</td><td>100</td><td>10</td></tr>' in html_output
+
+def test_historical_summary_derives_month_from_edited_dates(mocker, tmp_path):
+    mocker.patch('reports.historical_summary_report.get_output_dir', return_value=str(tmp_path))
+    from reports.historical_summary_report import run_report
+
+    site = 'https://www.example.com/'
+    pd.DataFrame({
+        'date': ['2024-02-01 00:00:00', '2024-01-01'], 'clicks': [2, 1], 'impressions': [20, 10], 'ctr': [0.1, 0.1],
+        'position': [2.0, 1.0], 'queries': [5, 4], 'pages': [3, 2]
+    }).to_csv(tmp_path / 'monthly-summary-report-www-example-com-2024.csv', index=False)
+
+    assert run_report(site)
+    df = pd.read_csv(tmp_path / 'historical-summary-www-example-com.csv')
+    assert df['month'].tolist() == ['2024-01', '2024-02']
+
+def test_consolidated_performance_overview_multiple_sites(mock_service, mocker):
+    sites = ['https://one.example.com/', 'sc-domain:example.com']
+    mocker.patch('reports.consolidated_performance_overview_report.get_available_properties', return_value=sites)
+    mocker.patch('reports.consolidated_performance_overview_report.prefetch_with_batch', return_value=set())
+
+    def fake_fetch(service, site_url, start_date, end_date, dimensions, search_type='web', **kwargs):
+        if dimensions:
+            return pd.DataFrame({'searchAppearance': ['VIDEO'], 'clicks': [5], 'impressions': [50], 'ctr': [0.1], 'position': [2.0]})
+        if search_type != 'web':
+            return pd.DataFrame()
+        return pd.DataFrame([{'clicks': 10, 'impressions': 100, 'ctr': 0.1, 'position': 1.5}])
+
+    mocker.patch('reports.consolidated_performance_overview_report.fetch_with_cache', side_effect=fake_fetch)
+    from reports.consolidated_performance_overview_report import run_report
+
+    html_path = run_report(mock_service, '2024-01-01', '2024-01-31', workers=2)
+
+    assert os.path.exists(html_path)
+    df = pd.read_csv(os.path.join('output', 'account', 'consolidated-performance-overview-2024-01-01-to-2024-01-31-search-types.csv'))
+    assert sorted(df['site_url'].tolist()) == sorted(sites)
+    assert set(df['search_type']) == {'web'}
+
+def test_consolidated_performance_overview_skips_denied_sites(mock_service, mocker):
+    sites = ['https://one.example.com/', 'sc-domain:example.com']
+    mocker.patch('reports.consolidated_performance_overview_report.get_available_properties', return_value=sites)
+    mocker.patch('reports.consolidated_performance_overview_report.prefetch_with_batch', return_value={'sc-domain:example.com'})
+
+    def fake_fetch(service, site_url, start_date, end_date, dimensions, search_type='web', **kwargs):
+        if dimensions:
+            return pd.DataFrame({'searchAppearance': ['VIDEO'], 'clicks': [5], 'impressions': [50], 'ctr': [0.1], 'position': [2.0]})
+        return pd.DataFrame([{'clicks': 10, 'impressions': 100, 'ctr': 0.1, 'position': 1.5}])
+
+    mock_fetch = mocker.patch('reports.consolidated_performance_overview_report.fetch_with_cache', side_effect=fake_fetch)
+    from reports.consolidated_performance_overview_report import run_report
+
+    run_report(mock_service, '2024-01-01', '2024-01-31', workers=2)
+
+    assert {call.args[1] for call in mock_fetch.call_args_list} == {'https://one.example.com/'}
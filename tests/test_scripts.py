@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+REPORTS_DIR = os.path.join(PROJECT_ROOT, 'reports')
+REPORT_SCRIPTS = sorted(f for f in os.listdir(REPORTS_DIR) if f.endswith('.py') and f != '__init__.py')
+
+@pytest.mark.parametrize('script', REPORT_SCRIPTS)
+def test_report_script_runs_as_main(script):
+    # Reports are run as `python reports/<script>.py` from the project root, so
+    # every core import must come after the script's sys.path setup.
+    result = subprocess.run(
+        [sys.executable, os.path.join('reports', script), '--help'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,22 @@
+import pandas as pd
+from core.tables import render_html_table, format_columns
+
+def test_render_html_table_structure():
+    df = pd.DataFrame({'Property': ['https://www.example.com/'], 'Total Clicks': ['1,234']})
+    table_html = render_html_table(df)
+    assert table_html.startswith('<table class="dataframe table table-striped table-hover">')
+    assert '<th>Property</th><th>Total Clicks</th>' in table_html
+    assert '<tr><td>https://www.example.com/</td><td>1,234</td></tr>' in table_html
+
+def test_render_html_table_escaping():
+    df = pd.DataFrame({'query': ['<b>shoes</b>', None]})
+    assert '&lt;b&gt;shoes&lt;/b&gt;' in render_html_table(df)
+    assert '<td>NaN</td>' in render_html_table(df)
+    assert '<b>shoes</b>' in render_html_table(df, escape=False)
+
+def test_format_columns():
+    df = pd.DataFrame({'month': ['2024-01'], 'clicks': [1234.0], 'ctr': [0.1234], 'position': [3.456]})
+    formatted = format_columns(df)
+    assert formatted.iloc[0].tolist() == ['2024-01', '1,234', '12.34%', '3.46']
+    # The input frame is left untouched
+    assert df['clicks'].iloc[0] == 1234.0
@@ -0,0 +1,7 @@
+from core.templates import get_template
+
+def test_get_template_is_parsed_once():
+    first = get_template('report-blank.html', 'resources')
+    second = get_template('report-blank.html', 'resources')
+    assert first is second
+    assert 'Account Summary' in first.render(domain_name='Account Summary')
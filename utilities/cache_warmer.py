@@ -6,13 +6,14 @@ import os
 import sys
 import argparse
 import calendar
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from dateutil.relativedelta import relativedelta
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from core.client import get_gsc_service
+from core.client import get_gsc_service, get_thread_service
 from core.cache import fetch_with_cache
 from core.date_utils import (
     get_latest_available_date, 
@@ -45,6 +46,7 @@ def parse_month(month_str):
 
 def warm_site(service, site_url, lookback_months=16, max_rows=100000, start_date_str=None, end_date_str=None):
     """Primes all golden dimension caches for a single site."""
+    service = get_thread_service(service)
     print(f"\n{'='*60}")
     print(f"WARMING CACHE FOR: {site_url}")
     print(f"{'='*60}")
@@ -101,6 +103,7 @@ def main():
     parser.add_argument('--months', type=int, default=16, help='Number of months to look back (default 16).')
     parser.add_argument('--month', type=parse_month, help='Target calendar month to warm (YYYY-MM).')
     parser.add_argument('--max-rows', type=int, default=100000, help='Maximum rows to fetch per month for multi-dimensional granular data (default 100000).')
+    parser.add_argument('--workers', type=int, default=4, help='Number of sites to warm concurrently (default 4).')
     
     args = parser.parse_args()
     
@@ -129,8 +132,16 @@ def main():
     if args.month:
         start_date, end_date = args.month
         
-    for site in site_list:
-        warm_site(service, site, args.months, args.max_rows, start_date, end_date)
+    def warm(site):
+        try:
+            warm_site(service, site, args.months, args.max_rows, start_date, end_date)
+        except Exception as e:
+            print(f"  [!] Error warming {site}: {e}")
+
+    # Sites are independent network-bound work; the shared rate limiter in
+    # core.client keeps the combined request rate within the GSC quota.
+    with ThreadPoolExecutor(max_workers=max(1, min(args.workers, len(site_list)))) as executor:
+        list(executor.map(warm, site_list))
         
     print(f"\n{'='*60}")
     print("CACHE WARMING COMPLETE")
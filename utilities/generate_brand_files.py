@@ -43,7 +43,7 @@ def get_gsc_service():
         with open(TOKEN_FILE, 'w') as token:
             token.write(creds.to_json())
 
-    return build('webmasters', 'v3', credentials=creds)
+    return build('webmasters', 'v3', credentials=creds, static_discovery=True)
 
 def get_all_sites(service):
     """Fetches a list of all sites in the user's GSC account."""
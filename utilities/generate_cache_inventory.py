@@ -12,13 +12,12 @@ import argparse
 import hashlib
 from pathlib import Path
 from collections import defaultdict
-from urllib.parse import urlparse
 import pandas as pd
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from core.naming import get_property_name, get_output_dir, get_filename_slug
+from core.naming import get_property_name, get_output_dir, get_filename_slug, get_base_domain
 
 try:
     from core.client import get_gsc_service, get_available_properties
@@ -46,22 +45,6 @@ DIM_LABELS = {
     tuple(['page', 'query']): 'page+query'
 }
 
-def get_base_domain(site_url):
-    """Extracts a base domain from a GSC site URL."""
-    if site_url.startswith('sc-domain:'):
-        return site_url.replace('sc-domain:', '')
-    
-    hostname = urlparse(site_url).hostname
-    if not hostname:
-        return site_url
-
-    parts = hostname.split('.')
-    if len(parts) > 2 and parts[-2] in ['co', 'com', 'org', 'net', 'gov', 'ac', 'ltd', 'info', 'biz', 'io']:
-        return '.'.join(parts[-3:])
-    if len(parts) > 1:
-        return '.'.join(parts[-2:])
-    return hostname
-
 def get_month_range(year, month):
     """Returns the start and end dates of a month."""
     last_day = calendar.monthrange(year, month)[1]
@@ -5,8 +5,8 @@ This script authenticates with the Google Search Console API, fetches the list o
 sites associated with the user's account, and displays them grouped by base domain.
 """
 import os
+import sys
 from collections import defaultdict
-from urllib.parse import urlparse
 
 # --- Google API Imports ---
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -16,6 +16,11 @@ from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from google.auth import exceptions
 
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.naming import get_base_domain
+
 # --- Configuration ---
 SCOPES = ['https://www.googleapis.com/auth/webmasters.readonly']
 CLIENT_SECRET_FILE = 'config/client_secret.json'
@@ -55,7 +60,7 @@ def get_gsc_service():
             token.write(creds.to_json())
             print("Authentication successful. Credentials saved.")
 
-    return build('webmasters', 'v3', credentials=creds)
+    return build('webmasters', 'v3', credentials=creds, static_discovery=True)
 
 def get_sites_from_api(service):
     """Fetches all sites from the GSC API."""
@@ -74,22 +79,6 @@ def get_sites_from_api(service):
         print(f"An unexpected error occurred: {e}")
         return None
 
-def get_base_domain(site_url):
-    """Extracts a base domain from a GSC site URL."""
-    if site_url.startswith('sc-domain:'):
-        return site_url.replace('sc-domain:', '')
-    
-    hostname = urlparse(site_url).hostname
-    if not hostname:
-        return site_url # Fallback for unusual cases
-
-    parts = hostname.split('.')
-    if len(parts) > 2 and parts[-2] in ['co', 'com', 'org', 'net', 'gov', 'ac', 'ltd', 'info', 'biz', 'io']:
-        return '.'.join(parts[-3:])
-    if len(parts) > 1:
-        return '.'.join(parts[-2:])
-    return hostname
-
 if __name__ == "__main__":
     service = get_gsc_service()
     if not service:
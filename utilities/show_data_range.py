@@ -59,7 +59,7 @@ def get_gsc_service():
         with open(TOKEN_FILE, 'w') as token:
             token.write(creds.to_json())
 
-    return build('webmasters', 'v3', credentials=creds)
+    return build('webmasters', 'v3', credentials=creds, static_discovery=True)
 
 def get_latest_available_gsc_date(service, site_url, max_retries=10):
     """
@@ -79,7 +79,7 @@ def get_latest_available_gsc_date(service, site_url, max_retries=10):
                 'dimensions': ['date'],
                 'rowLimit': 1
             }
-            response = service.searchanalytics().query(siteUrl=site_url, body=request).execute()
+            response = service.searchanalytics().query(siteUrl=site_url, body=request, fields='rows/keys').execute()
             
             if 'rows' in response and response['rows']:
                 print(f"Latest available GSC data found for: {check_date_str}")